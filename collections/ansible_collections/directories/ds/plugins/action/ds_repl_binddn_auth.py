@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from ansible_collections.directories.ds.plugins.plugin_utils.ds_ldap_cache import DsLdapCacheAction
+
+
+class ActionModule(DsLdapCacheAction):
+    """Reuse the LDAP endpoint resolved by earlier directories.ds tasks for this instance."""
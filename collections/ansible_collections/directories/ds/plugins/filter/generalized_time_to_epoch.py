@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-import re
-from datetime import datetime, timezone
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
 
 
 DOCUMENTATION = r'''
@@ -14,6 +13,7 @@ author: directories.ds (@directories-ds)
 description:
   - Converts LDAP Generalized Time strings (UTC with trailing Z) into an integer epoch seconds value.
   - Supports strict forms C(YYYYmmddHHMMSSZ) and fractional seconds C(YYYYmmddHHMMSS.ffffffZ) (fraction truncated).
+  - The companion filter C(generalized_times_to_epoch) converts a whole list in one call.
 options:
   _input:
     description: LDAP Generalized Time string.
@@ -31,34 +31,34 @@ tasks:
       e1: "{{ t1 | generalized_time_to_epoch }}"
       e2: "{{ t2 | generalized_time_to_epoch }}"
       e3: "{{ t3 | generalized_time_to_epoch }}"
+      all_epochs: "{{ [t1, t2, t3] | generalized_times_to_epoch }}"
 '''
 
 
-_GTZ_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})(?:\.\d+)?Z$")
-
-
 def generalized_time_to_epoch(value: str) -> int | None:
     """Convert LDAP Generalized Time (UTC Z) to epoch seconds.
 
     Accepts YYYYmmddHHMMSSZ and YYYYmmddHHMMSS.ffffffZ (fraction truncated).
     Returns int epoch seconds or None if unparsable.
     """
-    if not isinstance(value, str):
-        return None
-    m = _GTZ_RE.match(value)
-    if not m:
-        return None
-    try:
-        y, mo, d, h, mi, s = (int(m.group(i)) for i in range(1, 7))
-        dt = datetime(y, mo, d, h, mi, s, tzinfo=timezone.utc)
-        return int(dt.timestamp())
-    except Exception:
-        return None
+    return dsldap.generalized_time_to_epoch(value)
+
+
+def generalized_times_to_epoch(values) -> list[int | None]:
+    """Convert a list of LDAP Generalized Time strings in one filter call.
+
+    Avoids a Jinja filter dispatch per element (e.g. via map()); unparsable items become None.
+    """
+    if isinstance(values, str) or not hasattr(values, '__iter__'):
+        return [generalized_time_to_epoch(values)]
+    conv = generalized_time_to_epoch
+    return [conv(v) for v in values]
 
 
 class FilterModule(object):
     def filters(self):
         return {
             'generalized_time_to_epoch': generalized_time_to_epoch,
+            'generalized_times_to_epoch': generalized_times_to_epoch,
         }
 
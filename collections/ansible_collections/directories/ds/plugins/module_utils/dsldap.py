@@ -1,29 +1,62 @@
 # -*- coding: utf-8 -*-
 
 """
-Lightweight LDAP helper for directories.ds modules using OpenLDAP CLI.
+Lightweight LDAP helper for directories.ds modules using python-ldap or the OpenLDAP CLI.
 
 Features:
+  - In-process python-ldap backend when importable: one bound connection is reused for every operation.
+    Set DSLDAP_FORCE_CLI=1 to force the OpenLDAP CLI path.
   - LDAPI (SASL/EXTERNAL) first, with /run and /data/run socket paths.
   - LDAPS fallback with SIMPLE or client-cert (sslclientauth via SASL/EXTERNAL over TLS).
-  - search_one, search, add, modify, delete with subprocess timeouts and retry with jitter.
+  - search_one, search, search_each (pipelined multi-DN read), compare, add, add_then_modify, modify, batch_modify, delete with subprocess timeouts and
+    exponential backoff; deterministic LDAP errors (e.g. no such object, already exists) fail without retrying.
+  - The first search of a client starts on all candidate URLs in parallel, so dead endpoints time out
+    side by side rather than one after another; priority order is still honoured.
+  - No probe round-trip: the real operation fails over to the next URL when an endpoint is unreachable,
+    and the first endpoint that answers is reused for later operations.
+  - close() (or use as a context manager) unbinds the python-ldap connection once a caller is done with it.
   - Raises DsLdapError(code, hint) on failures.
 """
 
 from __future__ import annotations
 
+import base64
+import calendar
+import functools
 import os
 import random
+import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+try:
+    import ldap
+    HAS_PYTHON_LDAP = True
+except ImportError:  # pragma: no cover - CLI fallback
+    ldap = None
+    HAS_PYTHON_LDAP = False
 
 CONNECT_TIMEOUT = 5   # seconds
 OP_TIMEOUT = 30       # seconds
 RETRIES = 3
 BACKOFF_BASE = 0.5    # seconds
+# TCP keepalive for long-lived LDAPS connections (idle seconds, probes, probe interval), so a middlebox
+# dropping an idle session during a long wait is noticed instead of hanging the next operation
+KEEPALIVE = (60, 3, 10)
+
+# Deterministic LDAP result codes: retrying cannot change the outcome
+# (compare false/true, no such attribute, constraint, type/value exists, invalid syntax, no such object,
+#  invalid DN, invalid credentials, insufficient access, unwilling, naming/objectclass violations, already exists)
+NON_RETRYABLE_CODES = frozenset((5, 6, 16, 19, 20, 21, 32, 34, 49, 50, 53, 64, 65, 67, 68))
+COMPARE_FALSE, COMPARE_TRUE = 5, 6
+
+# OpenLDAP tools exit with LDAP_SERVER_DOWN (-1, seen as 255) when the endpoint cannot be reached
+CONNECT_ERROR_CODES = (-1, 255)
+# The same condition as reported in tool stderr; searched case-insensitively in place of a lowered copy
+_CONNECT_ERROR_RE = re.compile(r"can't contact ldap server", re.IGNORECASE)
 
 
 class DsLdapError(Exception):
@@ -33,6 +66,211 @@ class DsLdapError(Exception):
         self.hint = hint
 
 
+def _native_error(exc: Exception) -> DsLdapError:
+    """Map a python-ldap exception to DsLdapError, keeping the LDAP result code."""
+    info = exc.args[0] if exc.args and isinstance(exc.args[0], dict) else {}
+    desc = info.get("desc") or exc.__class__.__name__
+    return DsLdapError(f"LDAP operation failed: {desc}", code=info.get("result"), hint=str(info.get("info") or desc)[:512])
+
+
+def _native_entries(res: List[Any]) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    for dn, entry_attrs in res:
+        if dn is None:  # search continuation reference
+            continue
+        entries.append({
+            "dn": dn,
+            "attrs": {k: [v.decode("utf-8", errors="ignore") for v in vals] for k, vals in entry_attrs.items()},
+        })
+    return entries
+
+
+def _to_bytes(val: Any) -> bytes:
+    return val if isinstance(val, bytes) else (val if isinstance(val, str) else str(val)).encode("utf-8")
+
+
+def _native_addlist(attrs: Optional[Dict[str, Any]]) -> List[Tuple[str, List[bytes]]]:
+    return [
+        (k, [_to_bytes(val) for val in v] if isinstance(v, (list, tuple)) else [_to_bytes(v)])
+        for k, v in (attrs or {}).items() if v is not None
+    ]
+
+
+def _backoff_schedule(op_timeout: int) -> Tuple[float, ...]:
+    """Delay after each failed attempt but the last: exponential (0.5s, 1s, 2s, ...) capped at a quarter of the op timeout."""
+    return tuple(min(op_timeout / 4, BACKOFF_BASE * (2 ** (attempt - 1))) for attempt in range(1, RETRIES))
+
+
+def _is_connect_error(err: DsLdapError) -> bool:
+    return err.code in CONNECT_ERROR_CODES or (err.hint is not None and _CONNECT_ERROR_RE.search(err.hint) is not None)
+
+
+def _add_lines(attrs: Optional[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+    lines: List[Tuple[str, Any]] = []
+    for k, v in (attrs or {}).items():
+        if isinstance(v, (list, tuple)):
+            for val in v:
+                lines.append((k, val))
+        elif v is not None:
+            lines.append((k, v))
+    return lines
+
+
+def _modify_lines(changes: Optional[List[Tuple[str, Any]]]) -> List[Tuple[str, Any]]:
+    lines: List[Tuple[str, Any]] = []
+    for ch in changes or []:
+        if not isinstance(ch, (list, tuple)) or len(ch) < 2:
+            raise DsLdapError("Invalid change tuple")
+        op = ch[0]
+        attr = ch[1]
+        val = ch[2] if len(ch) > 2 else None
+        if op not in ("add", "delete", "replace"):
+            raise DsLdapError("Unsupported modify op; use add|delete|replace")
+        lines.append((op, attr))
+        if val is None:
+            pass
+        elif isinstance(val, (list, tuple)):
+            for v in val:
+                lines.append((attr, v))
+        else:
+            lines.append((attr, val))
+        lines.append(("-", None))
+    return lines
+
+
+# RFC 2849 SAFE-STRING: printable ASCII, not starting with space, ':' or '<'.
+_LDIF_SAFE = re.compile(r'[\x21-\x39\x3B\x3D-\x7E][\x20-\x7E]*\Z').match
+
+
+def _ldif_line(attr: str, val: Any) -> bytes:
+    """Render one 'attr: value' line, base64-encoding values that are not LDIF-safe."""
+    if isinstance(val, bytes):
+        return b"%s:: %s\n" % (attr.encode("utf-8"), base64.b64encode(val))
+    if not isinstance(val, str):
+        val = str(val)
+    if _LDIF_SAFE(val):
+        return b"%s: %s\n" % (attr.encode("utf-8"), val.encode("ascii"))
+    return b"%s:: %s\n" % (attr.encode("utf-8"), base64.b64encode(val.encode("utf-8")))
+
+
+def _ldif_value(raw: bytes) -> str:
+    """Decode the part of an LDIF line after the first ':' ('value' or ': base64')."""
+    if raw[:1] == b":":
+        try:
+            return base64.b64decode(raw[1:].strip()).decode("utf-8", errors="ignore")
+        except ValueError:
+            pass
+    return raw.strip().decode("utf-8", errors="ignore")
+
+
+def _ldif_bytes(records: List[Tuple[str, str, List[Tuple[str, Any]]]]) -> bytes:
+    """Serialize (dn, changetype, [(attr, value), ...]) change records into one LDIF buffer.
+
+    A pair with value None is written bare (e.g. the ("-", None) modify separator).
+    """
+    buf = bytearray()
+    for dn, changetype, lines in records:
+        buf += _ldif_line("dn", dn)
+        buf += b"changetype: %s\n" % changetype.encode("utf-8")
+        for attr, val in lines:
+            if val is None:
+                buf += b"%s\n" % attr.encode("utf-8")
+            else:
+                buf += _ldif_line(attr, val)
+        buf += b"\n"
+    return bytes(buf)
+
+
+_SUFFIX_ESC_TABLE = str.maketrans({'=': '\\3D', ',': '\\2C'})
+
+
+@functools.lru_cache(maxsize=128)
+def escape_suffix_value(suffix_dn: str) -> str:
+    """Escape a suffix DN for use as the cn value of its mapping tree entry."""
+    return suffix_dn.translate(_SUFFIX_ESC_TABLE)
+
+
+@functools.lru_cache(maxsize=128)
+def replica_dn(suffix_dn: str) -> str:
+    """Return the replica entry DN for a suffix."""
+    return f"cn=replica,cn={escape_suffix_value(suffix_dn)},cn=mapping tree,cn=config"
+
+
+def ldap_filter_escape(value: Any) -> str:
+    """Escape RFC 4515 filter metacharacters in an assertion value."""
+    out = str(value).replace("\\", "\\5c")
+    for ch, esc in (("*", "\\2a"), ("(", "\\28"), (")", "\\29"), ("\x00", "\\00")):
+        out = out.replace(ch, esc)
+    return out
+
+
+@functools.lru_cache(maxsize=1024)
+def _gtz_epoch(value: str) -> Optional[int]:
+    # Fixed-width YYYYmmddHHMMSS[.fraction]Z: slice the fields rather than running a regex
+    if len(value) < 15 or value[-1] != "Z":
+        return None
+    digits, frac = value[:14], value[14:-1]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    if frac and not (frac[0] == "." and frac[1:].isascii() and frac[1:].isdigit()):
+        return None
+    y, mo, d = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+    h, mi, s = int(digits[8:10]), int(digits[10:12]), int(digits[12:14])
+    # timegm() does not range-check fields
+    if not (y and 1 <= mo <= 12 and 1 <= d <= calendar.monthrange(y, mo)[1] and h < 24 and mi < 60 and s < 60):
+        return None
+    # UTC: pure arithmetic, no timezone or DST lookup
+    return calendar.timegm((y, mo, d, h, mi, s, 0, 0, 0))
+
+
+def generalized_time_to_epoch(value: Any) -> Optional[int]:
+    """Convert LDAP Generalized Time (YYYYmmddHHMMSS[.fraction]Z) to epoch seconds, or None.
+
+    Agreements updated in the same burst share timestamps, so each distinct value is parsed once.
+    """
+    return _gtz_epoch(value) if isinstance(value, str) else None
+
+
+def lc_index(attrs: Any) -> Dict[str, Any]:
+    """Lowercased-name view of a parsed LDIF attrs dict, built once per entry."""
+    if not isinstance(attrs, dict):
+        return {}
+    return {k.lower(): v for k, v in attrs.items() if isinstance(k, str)}
+
+
+def extract_backlogs(mon: Any, wanted: Optional[set] = None) -> Dict[str, int]:
+    """Map agreement name -> backlog from `dsconf -j replication monitor` output.
+
+    Iterative walk; each dict is scanned once for its name, its backlog key and the children to visit.
+    Stops early once every name in `wanted` has been found (the monitor also lists other servers' agreements).
+    """
+    out: Dict[str, int] = {}
+    stack = [mon]
+    while stack:
+        x = stack.pop()
+        if isinstance(x, dict):
+            nm = None
+            bl = None
+            for kk, vv in x.items():
+                lk = kk.lower() if isinstance(kk, str) else ""
+                if lk == "name" and isinstance(vv, str):
+                    nm = vv
+                elif "backlog" in lk:
+                    try:
+                        bl = int(vv)
+                    except Exception:
+                        pass
+                elif isinstance(vv, (dict, list)):
+                    stack.append(vv)
+            if nm and bl is not None:
+                out[nm] = bl
+                if wanted and wanted <= out.keys():
+                    break
+        elif isinstance(x, list):
+            stack.extend(x)
+    return out
+
+
 def build_ldapi_url(instance: str, base_dir: str = "/run") -> str:
     """Return a percent-encoded LDAPI URL for the instance socket.
 
@@ -67,14 +305,26 @@ class LdapConnParams:
     tls_client_key: Optional[str] = None
     connect_timeout: int = CONNECT_TIMEOUT
     op_timeout: int = OP_TIMEOUT
+    # Endpoint a previous task resolved for this instance; tried first when it is a candidate
+    preferred_url: Optional[str] = None
 
 
 class DsLdap:
-    """Simple wrapper invoking ldapsearch/ldapmodify/ldapdelete with retries."""
+    """LDAP client over a reused python-ldap connection, or ldapsearch/ldapmodify/ldapdelete with retries."""
 
     def __init__(self, params: LdapConnParams) -> None:
         self.params = params
         self.urls: List[str] = []
+        # (url, auth_argv, env) of the first endpoint that answered; later ops go straight to it
+        self._resolved: Optional[Tuple[str, List[str], Optional[Dict[str, str]]]] = None
+        # Merged environment for LDAPS TLS overrides, built at most once per client
+        self._cached_env: Optional[Tuple[Tuple[Optional[str], ...], Dict[str, str]]] = None
+        # python-ldap connection, bound once and reused across operations
+        self._native = HAS_PYTHON_LDAP and os.environ.get("DSLDAP_FORCE_CLI") != "1"
+        self._conn: Any = None
+        self._conn_url: Optional[str] = None
+        # Retry delays depend only on op_timeout, so the schedule is computed once; jitter is added per sleep
+        self._backoff = _backoff_schedule(params.op_timeout)
         if params.use_ldapi:
             # Check socket existence before adding URLs
             run_socket = f"/run/slapd-{params.instance}.socket"
@@ -90,15 +340,41 @@ class DsLdap:
                 self.urls.append(build_ldapi_url(params.instance, "/data/run"))
         if params.ldaps_host:
             self.urls.append(f"ldaps://{params.ldaps_host}:{params.ldaps_port}")
+        if params.preferred_url and params.preferred_url in self.urls:
+            self.urls.remove(params.preferred_url)
+            self.urls.insert(0, params.preferred_url)
+
+    def close(self) -> None:
+        """Unbind the python-ldap connection, if one is open; the client rebinds on next use."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.unbind_s()
+            except ldap.LDAPError:
+                pass
+
+    def __enter__(self) -> DsLdap:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def resolved_url(self) -> Optional[str]:
+        """URL of the endpoint operations are currently using, once one has answered."""
+        if self._native:
+            return self._conn_url if self._conn is not None else None
+        return self._resolved[0] if self._resolved is not None else None
 
-    def _auth_args(self, url: str) -> Tuple[List[str], Dict[str, str]]:
-        env = os.environ.copy()
+    def _auth_args(self, url: str) -> Tuple[List[str], Optional[Dict[str, str]]]:
+        """Return (auth argv, env); env is None when the child can inherit os.environ as-is."""
         argv: List[str] = []
+        overrides: Dict[str, str] = {}
         if url.startswith("ldapi://"):
             argv += ["-Y", "EXTERNAL"]
         else:
             if self.params.tls_ca:
-                env["LDAPTLS_CACERT"] = self.params.tls_ca
+                overrides["LDAPTLS_CACERT"] = self.params.tls_ca
             if self.params.bind_method == "simple":
                 if not self.params.bind_dn or not self.params.bind_pw:
                     raise DsLdapError("SIMPLE bind requires bind_dn and bind_pw", hint="Provide bind_dn/bind_pw or use ldapi")
@@ -106,23 +382,32 @@ class DsLdap:
             elif self.params.bind_method == "sslclientauth":
                 if not self.params.tls_client_cert or not self.params.tls_client_key:
                     raise DsLdapError("sslclientauth requires tls_client_cert and tls_client_key")
-                env["LDAPTLS_CERT"] = self.params.tls_client_cert
-                env["LDAPTLS_KEY"] = self.params.tls_client_key
+                overrides["LDAPTLS_CERT"] = self.params.tls_client_cert
+                overrides["LDAPTLS_KEY"] = self.params.tls_client_key
                 argv += ["-Y", "EXTERNAL"]
-        return argv, env
+        if not overrides:
+            return argv, None
+        key = (self.params.tls_ca, self.params.tls_client_cert, self.params.tls_client_key)
+        if self._cached_env is None or self._cached_env[0] != key:
+            self._cached_env = (key, {**os.environ, **overrides})
+        return argv, self._cached_env[1]
 
-    def _run_with_retry(self, argv: List[str], env: Optional[Dict[str, str]] = None, stdin: Optional[str] = None) -> subprocess.CompletedProcess:
+    def _run_with_retry(self, argv: List[str], env: Optional[Dict[str, str]] = None, stdin: Optional[bytes] = None) -> subprocess.CompletedProcess:
         last_err: Optional[Exception] = None
+        # stdin is already encoded once by the caller; ops without input get /dev/null instead of
+        # inheriting the module's stdin (a tool waiting on it would only end at op_timeout)
+        stdin_kw: Dict[str, Any] = {"input": stdin} if stdin is not None else {"stdin": subprocess.DEVNULL}
         for attempt in range(1, RETRIES + 1):
             try:
                 cp = subprocess.run(
                     argv,
-                    input=(stdin.encode("utf-8") if stdin is not None else None),
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     env=env,
                     timeout=self.params.op_timeout,
                     check=False,
+                    close_fds=True,
+                    **stdin_kw,
                 )
                 if cp.returncode == 0:
                     return cp
@@ -130,140 +415,365 @@ class DsLdap:
                     f"Command failed rc={cp.returncode}", code=cp.returncode,
                     hint=(cp.stderr.decode(errors='ignore') or cp.stdout.decode(errors='ignore'))[:512]
                 )
+                if cp.returncode in NON_RETRYABLE_CODES:
+                    break
             except subprocess.TimeoutExpired as te:
                 last_err = DsLdapError("LDAP command timeout", hint=str(te))
             if attempt < RETRIES:
-                time.sleep(BACKOFF_BASE * attempt + random.uniform(0, 0.25))
+                time.sleep(self._backoff[attempt - 1] + random.random() * 0.1)
         assert last_err is not None
         raise last_err
 
-    def _first_ok(self) -> Tuple[str, List[str], Dict[str, str]]:
+    def _native_bind(self, url: str) -> Any:
+        conn = ldap.initialize(url)
+        conn.set_option(ldap.OPT_PROTOCOL_VERSION, 3)
+        conn.set_option(ldap.OPT_REFERRALS, 0)
+        conn.set_option(ldap.OPT_NETWORK_TIMEOUT, self.params.connect_timeout)
+        conn.set_option(ldap.OPT_TIMEOUT, self.params.op_timeout)
+        if url.startswith("ldapi://"):
+            conn.sasl_non_interactive_bind_s("EXTERNAL")
+            return conn
+        for opt, val in zip(("OPT_X_KEEPALIVE_IDLE", "OPT_X_KEEPALIVE_PROBES", "OPT_X_KEEPALIVE_INTERVAL"), KEEPALIVE):
+            if hasattr(ldap, opt):
+                conn.set_option(getattr(ldap, opt), val)
+        if self.params.tls_ca:
+            conn.set_option(ldap.OPT_X_TLS_CACERTFILE, self.params.tls_ca)
+        if self.params.bind_method == "simple":
+            if not self.params.bind_dn or not self.params.bind_pw:
+                raise DsLdapError("SIMPLE bind requires bind_dn and bind_pw", hint="Provide bind_dn/bind_pw or use ldapi")
+            conn.set_option(ldap.OPT_X_TLS_NEWCTX, 0)
+            conn.simple_bind_s(self.params.bind_dn, self.params.bind_pw)
+        elif self.params.bind_method == "sslclientauth":
+            if not self.params.tls_client_cert or not self.params.tls_client_key:
+                raise DsLdapError("sslclientauth requires tls_client_cert and tls_client_key")
+            conn.set_option(ldap.OPT_X_TLS_CERTFILE, self.params.tls_client_cert)
+            conn.set_option(ldap.OPT_X_TLS_KEYFILE, self.params.tls_client_key)
+            conn.set_option(ldap.OPT_X_TLS_NEWCTX, 0)
+            conn.sasl_non_interactive_bind_s("EXTERNAL")
+        return conn
+
+    def _native_conn(self) -> Any:
+        if self._conn is not None:
+            return self._conn
         last_exc: Optional[Exception] = None
         for url in self.urls:
             try:
-                auth_argv, env = self._auth_args(url)
-                argv = ["ldapsearch", "-LLL", "-o", f"nettimeout={self.params.connect_timeout}"] + auth_argv + ["-H", url, "-s", "base", "-b", "", "1.1"]
-                cp = self._run_with_retry(argv, env=env)
-                if cp.returncode == 0:
-                    return url, auth_argv, env
-            except Exception as e:
+                self._conn = self._native_bind(url)
+                self._conn_url = url
+                return self._conn
+            except (ldap.SERVER_DOWN, ldap.CONNECT_ERROR, ldap.TIMEOUT) as e:
+                last_exc = _native_error(e)
+            except ldap.LDAPError as e:
+                raise _native_error(e)
+        raise DsLdapError("No usable LDAP URL (ldapi or ldaps) succeeded", hint=str(last_exc) if last_exc else None)
+
+    def _native_call(self, fn: Callable[[Any], Any]) -> Any:
+        """Run fn(conn) on the shared connection, rebinding if the server dropped it."""
+        for attempt in range(1, RETRIES + 1):
+            conn = self._native_conn()
+            try:
+                return fn(conn)
+            except (ldap.SERVER_DOWN, ldap.CONNECT_ERROR, ldap.TIMEOUT) as e:
+                self._conn = None
+                if attempt == RETRIES:
+                    raise _native_error(e)
+                time.sleep(self._backoff[attempt - 1] + random.random() * 0.1)
+            except ldap.LDAPError as e:
+                raise _native_error(e)
+        raise DsLdapError("LDAP operation failed")
+
+    def _native_search(
+        self, base: str, scope: str, flt: str, attrs: Sequence[str], page_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        scopes = {"base": ldap.SCOPE_BASE, "one": ldap.SCOPE_ONELEVEL, "sub": ldap.SCOPE_SUBTREE}
+        ldap_scope = scopes.get(scope, ldap.SCOPE_SUBTREE)
+        attrlist = list(attrs) if attrs else None
+        timeout = self.params.op_timeout
+        if page_size:
+            def _paged(conn):
+                from ldap.controls import SimplePagedResultsControl
+                ctrl = SimplePagedResultsControl(True, size=page_size, cookie="")
+                out = []
+                while True:
+                    msgid = conn.search_ext(base, ldap_scope, flt, attrlist, serverctrls=[ctrl], timeout=timeout)
+                    _rtype, rdata, _msgid, sctrls = conn.result3(msgid, timeout=timeout)
+                    out.extend(rdata)
+                    cookie = next(
+                        (c.cookie for c in sctrls if c.controlType == SimplePagedResultsControl.controlType), None
+                    )
+                    if not cookie:
+                        return out
+                    ctrl.cookie = cookie
+            res = self._native_call(_paged)
+        else:
+            res = self._native_call(lambda conn: conn.search_st(base, ldap_scope, flt, attrlist, timeout=timeout))
+        return _native_entries(res)
+
+    def _native_search_each(self, bases: Sequence[str], flt: str, attrs: Sequence[str]) -> List[Optional[List[Any]]]:
+        attrlist = list(attrs) if attrs else None
+        timeout = self.params.op_timeout
+
+        def _pipelined(conn):
+            # Every request goes out before the first result is read, so the round trips overlap on the one connection
+            msgids = [conn.search_ext(b, ldap.SCOPE_BASE, flt, attrlist, timeout=timeout) for b in bases]
+            out: List[Optional[List[Any]]] = []
+            for msgid in msgids:
+                try:
+                    out.append(conn.result3(msgid, timeout=timeout)[1])
+                except ldap.NO_SUCH_OBJECT:
+                    out.append(None)
+            return out
+        return self._native_call(_pipelined)
+
+    def _native_modify(self, changes_by_dn: Dict[str, List[Tuple[str, Any]]]) -> None:
+        mod_ops = {"add": ldap.MOD_ADD, "delete": ldap.MOD_DELETE, "replace": ldap.MOD_REPLACE}
+        for dn, changes in changes_by_dn.items():
+            modlist = []
+            for ch in changes or []:
+                if not isinstance(ch, (list, tuple)) or len(ch) < 2:
+                    raise DsLdapError("Invalid change tuple")
+                if ch[0] not in mod_ops:
+                    raise DsLdapError("Unsupported modify op; use add|delete|replace")
+                val = ch[2] if len(ch) > 2 else None
+                if val is not None:
+                    val = [_to_bytes(v) for v in val] if isinstance(val, (list, tuple)) else [_to_bytes(val)]
+                modlist.append((mod_ops[ch[0]], ch[1], val))
+            self._native_call(lambda conn, dn=dn, modlist=modlist: conn.modify_s(dn, modlist))
+
+    def _iter_urls(self) -> Iterator[Tuple[str, List[str], Optional[Dict[str, str]]]]:
+        """Yield (url, auth_argv, env) candidates, only the resolved one once known."""
+        if self._resolved is not None:
+            yield self._resolved
+            return
+        for url in self.urls:
+            auth_argv, env = self._auth_args(url)
+            yield url, auth_argv, env
+
+    def _cli_argv(self, tool: str, url: str, auth_argv: List[str], args: Sequence[str]) -> List[str]:
+        argv = [tool, "-o", f"nettimeout={self.params.connect_timeout}"]
+        argv.extend(auth_argv)
+        argv.extend(("-H", url))
+        argv.extend(args)
+        return argv
+
+    def _run_op(self, tool: str, args: Sequence[str], stdin: Optional[bytes] = None) -> subprocess.CompletedProcess:
+        """Run the real operation, failing over to the next URL only when the endpoint is unreachable."""
+        last_exc: Optional[Exception] = None
+        for url, auth_argv, env in self._iter_urls():
+            try:
+                cp = self._run_with_retry(self._cli_argv(tool, url, auth_argv, args), env=env, stdin=stdin)
+            except DsLdapError as e:
+                # Any other failure came from a reachable server; retrying elsewhere could repeat a write
+                if not _is_connect_error(e):
+                    raise
+                if self._resolved is not None:
+                    # The cached endpoint went away; forget it so the next operation resolves afresh
+                    self._resolved = None
+                    raise
                 last_exc = e
                 continue
+            self._resolved = (url, auth_argv, env)
+            return cp
         raise DsLdapError("No usable LDAP URL (ldapi or ldaps) succeeded", hint=str(last_exc) if last_exc else None)
 
-    def search_one(self, base: str, scope: str, flt: str, attrs: List[str]) -> Dict[str, Any]:
-        url, auth_argv, env = self._first_ok()
-        argv = [
-            "ldapsearch", "-LLL",
-            "-o", f"nettimeout={self.params.connect_timeout}",
-            "-o", "ldif-wrap=no",
-        ] + auth_argv + ["-H", url, "-s", scope, "-b", base, flt] + (attrs or [])
-        cp = self._run_with_retry(argv, env=env)
-        return self._parse_single_entry(cp.stdout.decode("utf-8", errors="ignore"))
-
-    def search(self, base: str, scope: str, flt: str, attrs: List[str]) -> List[Dict[str, Any]]:
-        url, auth_argv, env = self._first_ok()
-        argv = [
-            "ldapsearch", "-LLL",
-            "-o", f"nettimeout={self.params.connect_timeout}",
-            "-o", "ldif-wrap=no",
-        ] + auth_argv + ["-H", url, "-s", scope, "-b", base, flt] + (attrs or [])
-        cp = self._run_with_retry(argv, env=env)
-        return self._parse_entries(cp.stdout.decode("utf-8", errors="ignore"))
+    def _communicate(self, proc: subprocess.Popen) -> Optional[subprocess.CompletedProcess]:
+        try:
+            out, err = proc.communicate(timeout=self.params.op_timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return None
+        return subprocess.CompletedProcess(proc.args, proc.returncode, out, err)
+
+    def _race_search(self, args: Sequence[str]) -> Optional[subprocess.CompletedProcess]:
+        """Start a read-only search on every candidate URL at once (Happy Eyeballs style).
+
+        The result is taken from the highest-priority candidate that succeeds, the same one the
+        sequential walk would pick, but unreachable endpoints fail in parallel. Returns None when
+        no candidate won so the caller falls back to the regular retrying path and its errors.
+        """
+        procs = []
+        try:
+            for url in self.urls:
+                try:
+                    auth_argv, env = self._auth_args(url)
+                except DsLdapError:
+                    continue
+                proc = subprocess.Popen(
+                    self._cli_argv("ldapsearch", url, auth_argv, args),
+                    stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+                )
+                procs.append((url, auth_argv, env, proc))
+        except OSError:
+            for *_, proc in procs:
+                proc.kill()
+            return None
+        if not procs:
+            return None
+        winner: Optional[subprocess.CompletedProcess] = None
+        with ThreadPoolExecutor(max_workers=len(procs)) as pool:
+            futures = [pool.submit(self._communicate, proc) for *_, proc in procs]
+            for (url, auth_argv, env, _proc), fut in zip(procs, futures):
+                cp = fut.result()
+                if cp is not None and cp.returncode == 0:
+                    self._resolved = (url, auth_argv, env)
+                    winner = cp
+                    break
+                if cp is not None and cp.returncode not in CONNECT_ERROR_CODES:
+                    break  # a reachable server answered with an error; let the regular path report it
+            for *_, proc in procs:
+                if proc.poll() is None:
+                    proc.kill()
+        return winner
+
+    def search_one(self, base: str, scope: str, flt: str, attrs: Sequence[str]) -> Dict[str, Any]:
+        if self._native:
+            entries = self._native_search(base, scope, flt, attrs)
+            return entries[0] if entries else {"attrs": {}}
+        args = ["-LLL", "-o", "ldif-wrap=no", "-s", scope, "-b", base, flt]
+        if attrs:
+            args.extend(attrs)
+        cp = self._race_search(args) if self._resolved is None and len(self.urls) > 1 else None
+        if cp is None:
+            cp = self._run_op("ldapsearch", args)
+        entries = self._parse_entries_bytes(cp.stdout)
+        return entries[0] if entries else {"attrs": {}}
+
+    def search(
+        self, base: str, scope: str, flt: str, attrs: Sequence[str], page_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Search and return entries; page_size enables the Simple Paged Results control."""
+        if self._native:
+            return self._native_search(base, scope, flt, attrs, page_size)
+        args = ["-LLL", "-o", "ldif-wrap=no", "-s", scope, "-b", base]
+        if page_size:
+            args.extend(["-E", f"pr={int(page_size)}/noprompt"])
+        args.append(flt)
+        if attrs:
+            args.extend(attrs)
+        cp = self._race_search(args) if self._resolved is None and len(self.urls) > 1 else None
+        if cp is None:
+            cp = self._run_op("ldapsearch", args)
+        return self._parse_entries_bytes(cp.stdout)
+
+    def search_each(self, bases: Sequence[str], flt: str, attrs: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Base-scope read of several DNs; one entry (or None when absent) per DN, in order.
+
+        python-ldap pipelines the searches on the shared connection; the CLI path runs them side by side.
+        """
+        if not bases:
+            return []
+        if self._native:
+            return [(_native_entries(res) or [None])[0] if res is not None else None
+                    for res in self._native_search_each(bases, flt, attrs)]
+
+        def _one(base):
+            try:
+                e = self.search_one(base, "base", flt, attrs)
+            except DsLdapError as err:
+                if err.code == 32:  # noSuchObject
+                    return None
+                raise
+            return e if e.get("dn") else None
+        out: List[Optional[Dict[str, Any]]] = []
+        if self._resolved is None:
+            # Resolve the endpoint on this thread first; the workers then only read _resolved instead of
+            # each racing every URL and overwriting it
+            out.append(_one(bases[0]))
+        rest = bases[len(out):]
+        if len(rest) <= 1:
+            return out + [_one(b) for b in rest]
+        with ThreadPoolExecutor(max_workers=min(16, len(rest))) as ex:
+            out.extend(ex.map(_one, rest))
+        return out
 
     def add(self, dn: str, attrs: Dict[str, Any]) -> None:
-        url, auth_argv, env = self._first_ok()
-        ldif = [f"dn: {dn}", "changetype: add"]
-        for k, v in (attrs or {}).items():
-            if isinstance(v, (list, tuple)):
-                for val in v:
-                    ldif.append(f"{k}: {val}")
-            elif v is not None:
-                ldif.append(f"{k}: {v}")
-        ldif.append("")
-        argv = ["ldapmodify", "-o", f"nettimeout={self.params.connect_timeout}"] + auth_argv + ["-H", url, "-a"]
-        self._run_with_retry(argv, env=env, stdin="\n".join(ldif))
+        if self._native:
+            self._native_call(lambda conn: conn.add_s(dn, _native_addlist(attrs)))
+            return
+        self._run_op(
+            "ldapmodify", ("-a",),
+            stdin=_ldif_bytes([(dn, "add", _add_lines(attrs))]),
+        )
+
+    def add_then_modify(self, dn: str, attrs: Dict[str, Any], changes: List[Tuple[str, Any]]) -> None:
+        """Add an entry and immediately modify it in one ldapmodify run (one bind)."""
+        if self._native:
+            self._native_call(lambda conn: conn.add_s(dn, _native_addlist(attrs)))
+            self._native_modify({dn: changes})
+            return
+        self._run_op(
+            "ldapmodify", ("-a",),
+            stdin=_ldif_bytes([(dn, "add", _add_lines(attrs)), (dn, "modify", _modify_lines(changes))]),
+        )
 
     def modify(self, dn: str, changes: List[Tuple[str, Any]]) -> None:
-        url, auth_argv, env = self._first_ok()
-        ldif = [f"dn: {dn}", "changetype: modify"]
-        for ch in changes or []:
-            if not isinstance(ch, (list, tuple)) or len(ch) < 2:
-                raise DsLdapError("Invalid change tuple")
-            op = ch[0]
-            attr = ch[1]
-            val = ch[2] if len(ch) > 2 else None
-            if op not in ("add", "delete", "replace"):
-                raise DsLdapError("Unsupported modify op; use add|delete|replace")
-            ldif.append(f"{op}: {attr}")
-            if val is None:
-                pass
-            elif isinstance(val, (list, tuple)):
-                for v in val:
-                    ldif.append(f"{attr}: {v}")
-            else:
-                ldif.append(f"{attr}: {val}")
-            ldif.append("-")
-        ldif.append("")
-        argv = ["ldapmodify", "-o", f"nettimeout={self.params.connect_timeout}"] + auth_argv + ["-H", url]
-        self._run_with_retry(argv, env=env, stdin="\n".join(ldif))
+        self.batch_modify({dn: changes})
+
+    def batch_modify(self, changes_by_dn: Dict[str, List[Tuple[str, Any]]]) -> None:
+        """Apply modify records for several DNs through a single ldapmodify run."""
+        if not changes_by_dn:
+            return
+        if self._native:
+            self._native_modify(changes_by_dn)
+            return
+        records = [(dn, "modify", _modify_lines(changes)) for dn, changes in changes_by_dn.items()]
+        self._run_op(
+            "ldapmodify", (),
+            stdin=_ldif_bytes(records),
+        )
+
+    def compare(self, dn: str, attr: str, value: str) -> bool:
+        """LDAP compare; True when the server reports compareTrue. Other errors raise DsLdapError."""
+        if self._native:
+            return bool(self._native_call(lambda conn: conn.compare_s(dn, attr, _to_bytes(value))))
+        # ldapcompare reports the result through its exit status (5 compareFalse, 6 compareTrue)
+        assertion = f"{attr}::{base64.b64encode(_to_bytes(value)).decode('ascii')}"
+        try:
+            self._run_op("ldapcompare", ("-z", dn, assertion))
+        except DsLdapError as e:
+            if e.code == COMPARE_TRUE:
+                return True
+            if e.code == COMPARE_FALSE:
+                return False
+            raise
+        return False  # no compareTrue reported
 
     def delete(self, dn: str) -> None:
-        url, auth_argv, env = self._first_ok()
-        argv = ["ldapdelete", "-o", f"nettimeout={self.params.connect_timeout}"] + auth_argv + ["-H", url, dn]
-        self._run_with_retry(argv, env=env)
-
-    def _unfold(self, text: str) -> List[str]:
-        lines: List[str] = []
-        for raw in text.splitlines():
-            # LDIF line folding: continuation lines start with a single space
-            if raw.startswith(' ') and lines:
-                lines[-1] += raw[1:]
-            else:
-                lines.append(raw)
-        return lines
-
-    def _parse_single_entry(self, text: str) -> Dict[str, Any]:
-        entry: Dict[str, Any] = {"attrs": {}}
-        dn_seen = False
-        for line in self._unfold(text):
-            if not line.strip():
-                continue
-            if line.lower().startswith("dn: "):
-                entry["dn"] = line[4:].strip()
-                dn_seen = True
-                continue
-            if not dn_seen:
-                continue
-            if ":" in line:
-                k, v = line.split(":", 1)
-                k = k.strip()
-                v = v.strip()
-                entry.setdefault("attrs", {}).setdefault(k, []).append(v)
-        return entry
-
-    def _parse_entries(self, text: str) -> List[Dict[str, Any]]:
+        if self._native:
+            self._native_call(lambda conn: conn.delete_s(dn))
+            return
+        self._run_op("ldapdelete", (dn,))
+
+    def _parse_entries_bytes(self, buf: bytes) -> List[Dict[str, Any]]:
+        """Parse ldapsearch -LLL output in one pass over the raw bytes.
+
+        Folded lines are joined with a single C-level replace, then each logical line is
+        sliced out with bytes.find; only the DN and attribute values that are kept get decoded.
+        Base64 values ('attr:: ...') are decoded as well.
+        """
         entries: List[Dict[str, Any]] = []
         cur: Optional[Dict[str, Any]] = None
-        for line in self._unfold(text):
-            if not line.strip():
-                if cur is not None and ('dn' in cur):
+        data = buf.replace(b"\r\n", b"\n").replace(b"\n ", b"")
+        pos = 0
+        end = len(data)
+        while pos < end:
+            nl = data.find(b"\n", pos)
+            if nl < 0:
+                nl = end
+            if nl == pos or not data[pos:nl].strip():
+                if cur is not None:
                     entries.append(cur)
                 cur = None
-                continue
-            if line.lower().startswith('dn: '):
-                if cur is not None and ('dn' in cur):
+            elif data[pos:pos + 3].lower() == b"dn:":
+                if cur is not None:
                     entries.append(cur)
-                cur = {"attrs": {}}
-                cur["dn"] = line[4:].strip()
-                continue
-            if cur is None:
-                continue
-            if ':' in line:
-                k, v = line.split(':', 1)
-                k = k.strip()
-                v = v.strip()
-                cur.setdefault('attrs', {}).setdefault(k, []).append(v)
-        if cur is not None and ('dn' in cur):
+                cur = {"attrs": {}, "dn": _ldif_value(data[pos + 3:nl])}
+            elif cur is not None:
+                k, sep, v = data[pos:nl].partition(b":")
+                if sep:
+                    cur["attrs"].setdefault(k.strip().decode("utf-8", errors="ignore"), []).append(_ldif_value(v))
+            pos = nl + 1
+        if cur is not None:
             entries.append(cur)
         return entries
@@ -35,6 +35,7 @@ options:
   ldaps_port: {description: Fallback port, type: int, default: 636}
   connect_timeout: {description: Connect timeout, type: int, default: 5}
   op_timeout: {description: Operation timeout, type: int, default: 30}
+  _resolved_url: {description: Internal; endpoint resolved by an earlier task for this instance (set by the action plugin), type: str}
 '''
 
 EXAMPLES = r'''
@@ -53,6 +54,10 @@ EXAMPLES = r'''
 '''
 
 RETURN = r'''
+ldap_url:
+  description: LDAP endpoint the operations ran against; reused by later tasks for the same instance.
+  returned: when known
+  type: str
 agreement_dn:
   description: Managed agreement DN when known.
   returned: when known
@@ -69,21 +74,13 @@ changed:
 
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    from ansible_collections.directories.ds.plugins.module_utils import dsldap
-except Exception:  # pragma: no cover
-    import importlib.util
-    import sys
-    import pathlib
-    _p = pathlib.Path(__file__).resolve().parents[3] / 'module_utils' / 'dsldap.py'
-    spec = importlib.util.spec_from_file_location('dsldap', str(_p))
-    dsldap = importlib.util.module_from_spec(spec)
-    sys.modules[spec.name] = dsldap
-    spec.loader.exec_module(dsldap)
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
 
 
-def _escape_suffix_value(suffix_dn):
-    return suffix_dn.replace('=', '\\3D').replace(',', '\\2C')
+_AGREEMENT_ATTRS = (
+    'cn', 'nsds5ReplicaHost', 'nsds5ReplicaPort', 'nsds5ReplicaBindDN', 'nsds5ReplicaEnabled',
+    'nsds5ReplicaTransportInfo', 'nsds5ReplicaBackoffMin', 'nsds5ReplicaBackoffMax', 'nsds5ReplicaPurgeDelay', 'nsds5ReplicaBindMethod',
+)
 
 
 def _first(vals):
@@ -124,6 +121,7 @@ def run_module():
         ldaps_port=dict(type='int', default=636),
         connect_timeout=dict(type='int', default=5),
         op_timeout=dict(type='int', default=30),
+        _resolved_url=dict(type='str'),
     )
 
     module = AnsibleModule(argument_spec=args, supports_check_mode=True)
@@ -153,40 +151,36 @@ def run_module():
             tls_client_key=p.get('tls_client_key'),
             connect_timeout=p.get('connect_timeout'),
             op_timeout=p.get('op_timeout'),
+            preferred_url=p.get('_resolved_url'),
         )
         client = dsldap.DsLdap(conn)
     except Exception as e:
         module.fail_json(msg=f"Failed to create LDAP connection: {str(e)}")
 
-    esc_suffix = _escape_suffix_value(p['suffix'])
-    replica_dn = f"cn=replica,cn={esc_suffix},cn=mapping tree,cn=config"
+    replica_dn = dsldap.replica_dn(p['suffix'])
+
+    # Search for existing agreements by name or host:port in a single search
+    filter_hp = f"(&(nsds5ReplicaHost={dsldap.ldap_filter_escape(p['consumer_host'])})(nsds5ReplicaPort={p['consumer_port']}))"
+    if p.get('name'):
+        filter_agmt = f"(&(objectClass=nsDS5ReplicationAgreement)(|(cn={dsldap.ldap_filter_escape(p['name'])}){filter_hp}))"
+    else:
+        filter_agmt = f"(&(objectClass=nsDS5ReplicationAgreement){filter_hp})"
+    # The one-level search under the replica entry also proves replication is enabled:
+    # a missing replica entry surfaces as noSuchObject (32) on the search base
     try:
-        client.search_one(replica_dn, 'base', '(objectClass=*)', ['cn'])
+        found = client.search(replica_dn, 'one', filter_agmt, _AGREEMENT_ATTRS)
     except dsldap.DsLdapError as e:
-        module.fail_json(msg=f"Enable replication on suffix before creating agreements: {p['suffix']}", hint=getattr(e, 'hint', None))
+        if e.code == 32:
+            module.fail_json(msg=f"Enable replication on suffix before creating agreements: {p['suffix']}", hint=getattr(e, 'hint', None))
+        module.fail_json(msg=f"Failed to search agreements under {replica_dn}", hint=getattr(e, 'hint', None))
 
-    # Search for existing agreements by name first, then by host:port
+    # Prefer agreements matched by name, fall back to host:port matches
     existing = []
     if p.get('name'):
-        filter_name = f"(&(objectClass=nsDS5ReplicationAgreement)(cn={p['name']}))"
-        try:
-            existing = client.search(replica_dn, 'one', filter_name, [
-                'cn', 'nsds5ReplicaHost', 'nsds5ReplicaPort', 'nsds5ReplicaBindDN', 'nsds5ReplicaEnabled',
-                'nsds5ReplicaTransportInfo', 'nsds5ReplicaBackoffMin', 'nsds5ReplicaBackoffMax', 'nsds5ReplicaPurgeDelay', 'nsds5ReplicaBindMethod'
-            ])
-        except Exception:
-            existing = []
-    
-    # If no agreement found by name, search by host:port
+        lname = p['name'].lower()
+        existing = [e for e in found if (_first(e.get('attrs', {}).get('cn')) or '').lower() == lname]
     if not existing:
-        filter_hp = f"(&(objectClass=nsDS5ReplicationAgreement)(nsds5ReplicaHost={p['consumer_host']})(nsds5ReplicaPort={p['consumer_port']}))"
-        try:
-            existing = client.search(replica_dn, 'one', filter_hp, [
-                'cn', 'nsds5ReplicaHost', 'nsds5ReplicaPort', 'nsds5ReplicaBindDN', 'nsds5ReplicaEnabled',
-                'nsds5ReplicaTransportInfo', 'nsds5ReplicaBackoffMin', 'nsds5ReplicaBackoffMax', 'nsds5ReplicaPurgeDelay', 'nsds5ReplicaBindMethod'
-            ])
-        except Exception:
-            existing = []
+        existing = found
 
     warnings = []
     agmt_dn = ''
@@ -229,7 +223,7 @@ def run_module():
                 except dsldap.DsLdapError as e:
                     module.fail_json(msg=f"Failed to delete agreement {agmt_dn}", hint=getattr(e, 'hint', None))
             changed = True
-        module.exit_json(changed=changed, agreement_dn=agmt_dn, warnings=warnings)
+        module.exit_json(changed=changed, ldap_url=client.resolved_url, agreement_dn=agmt_dn, warnings=warnings)
 
     if not agmt_dn:
         cn_val = p.get('name') or f"agmt to {p['consumer_host']}:{p['consumer_port']}"
@@ -241,27 +235,21 @@ def run_module():
             }
             add_attrs.update(target_attrs)
             try:
-                client.add(agmt_dn, add_attrs)
-                # Enable the agreement after creation
-                client.modify(agmt_dn, [('replace', 'nsds5ReplicaEnabled', 'on')])
+                # Create and then enable the agreement in a single ldapmodify run
+                client.add_then_modify(agmt_dn, add_attrs, [('replace', 'nsds5ReplicaEnabled', 'on')])
             except dsldap.DsLdapError as e:
                 module.fail_json(msg=f"Failed to create agreement {agmt_dn}", hint=getattr(e, 'hint', None))
         changed = True
-        module.exit_json(changed=changed, agreement_dn=agmt_dn, effective=dict(
+        module.exit_json(changed=changed, ldap_url=client.resolved_url, agreement_dn=agmt_dn, effective=dict(
             host=p['consumer_host'], port=p['consumer_port'], bind_method=p['bind_method'], transport=p['transport'],
             backoff_min=p.get('backoff_min'), backoff_max=p.get('backoff_max'), purge_delay=p.get('purge_delay'), compression=p.get('compression')
         ), warnings=warnings)
 
     cur = existing[0].get('attrs', {}) if existing else {}
-    changes = []
-    for k, v in target_attrs.items():
-        cur_v = _first(cur.get(k))
-        if cur_v is None or str(cur_v) != str(v):
-            changes.append(('replace', k, v))
-    
-    # Check if agreement is enabled
-    cur_enabled = _first(cur.get('nsds5ReplicaEnabled'))
-    if cur_enabled is None or cur_enabled.lower() not in ('on', 'true', 'yes', '1'):
+    cur_scalar = {k: (v[0] if v else None) for k, v in cur.items()}
+    changes = [('replace', k, v) for k, v in target_attrs.items() if cur_scalar.get(k) != v]
+    # Enabled flag: the server may report on/ON/true, so compare case-insensitively
+    if (cur_scalar.get('nsds5ReplicaEnabled') or '').lower() not in ('on', 'true', 'yes', '1'):
         changes.append(('replace', 'nsds5ReplicaEnabled', 'on'))
 
     if changes:
@@ -272,7 +260,7 @@ def run_module():
                 warnings.append(f"Modify warning for {agmt_dn}: {getattr(e, 'hint', '')[:200]}")
         changed = True
 
-    module.exit_json(changed=changed, agreement_dn=agmt_dn, effective=dict(
+    module.exit_json(changed=changed, ldap_url=client.resolved_url, agreement_dn=agmt_dn, effective=dict(
         host=p['consumer_host'], port=p['consumer_port'], bind_method=p['bind_method'], transport=p['transport'],
         backoff_min=p.get('backoff_min'), backoff_max=p.get('backoff_max'), purge_delay=p.get('purge_delay'), compression=p.get('compression')
     ), warnings=warnings)
@@ -24,6 +24,7 @@ options:
   dm_pw: {description: Directory Manager password for remote ops, type: str}
   connect_timeout: {description: Connect timeout seconds, type: int, default: 5}
   op_timeout: {description: Operation timeout seconds, type: int, default: 30}
+  _resolved_url: {description: Internal; endpoint resolved by an earlier task for this instance (set by the action plugin), type: str}
 '''
 
 EXAMPLES = r'''
@@ -36,6 +37,10 @@ EXAMPLES = r'''
 '''
 
 RETURN = r'''
+ldap_url:
+  description: LDAP endpoint the operations ran against; reused by later tasks for the same instance.
+  returned: when known
+  type: str
 changed:
   description: Whether a change was made
   returned: always
@@ -45,20 +50,7 @@ changed:
 
 from ansible.module_utils.basic import AnsibleModule
 
-try:
-    from ansible_collections.directories.ds.plugins.module_utils import dsldap
-except Exception:  # pragma: no cover
-    import importlib.util
-    import sys
-    import pathlib
-    _p = pathlib.Path(__file__).resolve().parents[3] / 'module_utils' / 'dsldap.py'
-    spec = importlib.util.spec_from_file_location('dsldap', str(_p))
-    dsldap = importlib.util.module_from_spec(spec)
-    sys.modules[spec.name] = dsldap
-    spec.loader.exec_module(dsldap)
-
-def _escape_suffix_value(suffix_dn):
-    return suffix_dn.replace('=', '\\3D').replace(',', '\\2C')
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
 
 
 def _first(vals):
@@ -80,6 +72,7 @@ def run_module():
         dm_pw=dict(type='str', no_log=True),
         connect_timeout=dict(type='int', default=5),
         op_timeout=dict(type='int', default=30),
+        _resolved_url=dict(type='str'),
     )
 
     module = AnsibleModule(argument_spec=args, supports_check_mode=True)
@@ -95,14 +88,14 @@ def run_module():
         bind_pw=p.get('dm_pw'),
         connect_timeout=p.get('connect_timeout') or 5,
         op_timeout=p.get('op_timeout') or 30,
+        preferred_url=p.get('_resolved_url'),
     )
     client = dsldap.DsLdap(conn)
 
-    esc_suffix = _escape_suffix_value(p['suffix'])
-    replica_dn = f"cn=replica,cn={esc_suffix},cn=mapping tree,cn=config"
+    replica_dn = dsldap.replica_dn(p['suffix'])
     cur = {}
     try:
-        rep = client.search_one(replica_dn, 'base', '(objectClass=*)', ['nsds5ReplicaBindDN'])
+        rep = client.search_one(replica_dn, 'base', '(objectClass=*)', ('nsds5ReplicaBindDN',))
         cur = rep.get('attrs', {})
     except Exception as e:
         module.fail_json(msg=f"Replica entry missing for suffix {p['suffix']}", hint=str(e))
@@ -119,7 +112,7 @@ def run_module():
                 except Exception as e:
                     module.fail_json(msg='Failed adding bind DN to replica', hint=str(e))
             changed = True
-        module.exit_json(changed=changed)
+        module.exit_json(changed=changed, ldap_url=client.resolved_url)
     else:
         # absent
         if target in cur_vals:
@@ -129,7 +122,7 @@ def run_module():
                 except Exception as e:
                     module.fail_json(msg='Failed removing bind DN from replica', hint=str(e))
             changed = True
-        module.exit_json(changed=changed)
+        module.exit_json(changed=changed, ldap_url=client.resolved_url)
 
 
 def main():
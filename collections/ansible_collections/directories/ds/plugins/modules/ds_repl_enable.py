@@ -11,8 +11,12 @@ short_description: Enable 389-DS replication for a suffix/role
 version_added: "1.0.0"
 author: directories.ds (@directories-ds)
 description:
-  - Idempotently ensure replication is enabled for a given suffix and role using C(dsconf).
-  - Prefers local instance operations (LDAPI) if possible.
+  - Idempotently ensure replication is enabled for a given suffix and role.
+  - Reads the replica entry directly over one reused LDAP connection (LDAPI first, then C(conn_url) when it is
+    an C(ldaps://) URL); falls back to C(dsconf) when no LDAP endpoint answers.
+  - Consumers are enabled by adding the replica entry over that connection. Suppliers and hubs always go through
+    C(dsconf replication enable), which also creates the changelog (C(cn=changelog5,cn=config) on 389-DS before 2.0)
+    and validates the replica ID and role.
 options:
   instance:
     description: 389-DS instance name (e.g. C(slapd-example), C(localhost)).
@@ -44,9 +48,15 @@ options:
     description: Directory Manager password for remote connections.
     type: str
   op_timeout:
-    description: Operation timeout seconds for dsconf calls.
+    description: Operation timeout seconds for LDAP and dsconf calls.
     type: int
     default: 30
+  verify_after:
+    description:
+      - Re-read the replica state after a successful enable.
+      - When false, a successful enable is trusted and C(details) is built from the inputs.
+    type: bool
+    default: false
 '''
 
 EXAMPLES = r'''
@@ -68,7 +78,7 @@ changed:
   returned: always
   type: bool
 details:
-  description: Selected fields from dsconf JSON where available.
+  description: Replica type and ID where available.
   returned: when available
   type: dict
 '''
@@ -77,9 +87,18 @@ details:
 from ansible.module_utils.basic import AnsibleModule
 import json
 import subprocess
+from urllib.parse import urlsplit
+
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
+
+
+# (nsds5ReplicaType, nsds5Flags) per role, as dsconf writes them; hubs and consumers use the reserved ID 65535.
+_ROLE_REPLICA = {'supplier': ('3', '1'), 'hub': ('2', '1'), 'consumer': ('2', '0')}
+_READ_ONLY_REPLICA_ID = '65535'
+
 
 def _run(argv, timeout=30):
-    cp = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    cp = subprocess.run(argv, capture_output=True, text=True, errors='ignore', timeout=timeout)
     return cp
 
 
@@ -97,57 +116,94 @@ def _dsconf_base(params):
     return base
 
 
-def _get_state(module, params):
-    base = _dsconf_base(params)
+def _replica_id(params):
+    if params['role'] == 'supplier':
+        return str(params['replica_id']) if params.get('replica_id') else None
+    return _READ_ONLY_REPLICA_ID
+
+
+def _ldap_client(params):
+    """DsLdap over LDAPI and/or the ldaps:// conn_url, or None when neither is usable."""
+    ldaps_host = ldaps_port = None
+    if params.get('conn_url'):
+        u = urlsplit(params['conn_url'])
+        if u.scheme == 'ldaps' and u.hostname:
+            ldaps_host, ldaps_port = u.hostname, u.port or 636
+    if not params['use_ldapi'] and not ldaps_host:
+        return None
+    conn = dsldap.LdapConnParams(
+        instance=params['instance'],
+        use_ldapi=params['use_ldapi'],
+        ldaps_host=ldaps_host,
+        ldaps_port=ldaps_port or 636,
+        bind_dn=params.get('dm_dn'),
+        bind_pw=params.get('dm_pw'),
+        op_timeout=params.get('op_timeout', 30),
+    )
+    return dsldap.DsLdap(conn)
+
+
+def _get_state_ldap(client, params):
+    """Read the replica entry; raises DsLdapError for anything but a missing entry."""
+    try:
+        rep = client.search_one(dsldap.replica_dn(params['suffix']), 'base', '(objectClass=*)', ['nsds5ReplicaType', 'nsds5ReplicaId'])
+    except dsldap.DsLdapError as e:
+        if e.code == 32:
+            return False, None
+        raise
+    attrs_lc = {k.lower(): v for k, v in rep.get('attrs', {}).items()}
+    rt = (attrs_lc.get('nsds5replicatype') or [None])[0]
+    rid = (attrs_lc.get('nsds5replicaid') or [None])[0]
+    return bool(rt), dict(replica_type=rt, replica_id=rid)
+
+
+def _enable_ldap(client, params):
+    """Add the replica entry under the suffix mapping tree; returns False when it already exists."""
+    rtype, flags = _ROLE_REPLICA[params['role']]
+    attrs = {
+        'objectClass': ['top', 'nsds5replica', 'extensibleObject'],
+        'cn': 'replica',
+        'nsDS5ReplicaRoot': params['suffix'],
+        'nsDS5ReplicaType': rtype,
+        'nsDS5Flags': flags,
+        'nsDS5ReplicaId': _replica_id(params),
+    }
+    try:
+        client.add(dsldap.replica_dn(params['suffix']), attrs)
+    except dsldap.DsLdapError as e:
+        if e.code == 68:
+            return False
+        raise
+    return True
+
+
+def _get_state(base, params):
     argv = base + ["-j", "replication", "get", "--suffix", params['suffix']]
     try:
-        cp = _run(argv, timeout=params.get('op_timeout', 30))
+        # json.loads takes the raw bytes, so the document is not decoded and stripped into copies first;
+        # stderr is never read here, so it is not captured either
+        cp = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=params.get('op_timeout', 30))
         if cp.returncode != 0:
             return False, None
-        text = (cp.stdout.decode('utf-8', errors='ignore') or '').strip()
-        if not text:
+        if not cp.stdout or cp.stdout.isspace():
             return False, None
-        data = json.loads(text)
+        data = json.loads(cp.stdout)
         attrs = data.get('attrs', {}) if isinstance(data, dict) else {}
         # Normalize keys to lowercase because dsconf JSON uses lowercase attribute names
         attrs_lc = { (k.lower() if isinstance(k, str) else k): v for k, v in attrs.items() } if isinstance(attrs, dict) else {}
-        # Consider enabled when nsds5replicatype exists
-        enabled = 'nsds5replicatype' in attrs_lc and bool(attrs_lc.get('nsds5replicatype'))
-        # Return a compact details map
-        details = dict(
-            replica_type=attrs_lc.get('nsds5replicatype', [None])[0] if isinstance(attrs_lc.get('nsds5replicatype'), list) else attrs_lc.get('nsds5replicatype'),
-            replica_id=attrs_lc.get('nsds5replicaid', [None])[0] if isinstance(attrs_lc.get('nsds5replicaid'), list) else attrs_lc.get('nsds5replicaid'),
-        )
+        rt = attrs_lc.get('nsds5replicatype')
+        rt = (rt[0] if rt else None) if isinstance(rt, list) else rt
+        rid = attrs_lc.get('nsds5replicaid')
+        rid = (rid[0] if rid else None) if isinstance(rid, list) else rid
+        # Consider enabled when nsds5replicatype has a value
+        enabled = bool(rt)
+        details = dict(replica_type=rt, replica_id=rid)
         return enabled, details
-    except Exception:
+    except (OSError, subprocess.SubprocessError, ValueError):
         return False, None
 
 
-def run_module():
-    args_spec = dict(
-        instance=dict(type='str', required=True),
-        suffix=dict(type='str', required=True),
-        role=dict(type='str', required=True, choices=['supplier', 'hub', 'consumer']),
-        replica_id=dict(type='int', required=False),
-        use_ldapi=dict(type='bool', default=True),
-        conn_url=dict(type='str', required=False),
-        dm_dn=dict(type='str', required=False),
-        dm_pw=dict(type='str', required=False, no_log=True),
-        op_timeout=dict(type='int', default=30),
-    )
-
-    module = AnsibleModule(argument_spec=args_spec, supports_check_mode=True)
-    p = module.params
-
-    # Pre-check
-    enabled, details = _get_state(module, p)
-    if enabled:
-        module.exit_json(changed=False, enabled=True, details=details)
-
-    if module.check_mode:
-        module.exit_json(changed=True, enabled=True)
-
-    base = _dsconf_base(p)
+def _enable_dsconf(module, base, p):
     argv = base + [
         "replication", "enable",
         "--suffix", p['suffix'],
@@ -158,7 +214,7 @@ def run_module():
 
     cp = _run(argv, timeout=p.get('op_timeout', 30))
     if cp.returncode != 0:
-        stderr = (cp.stderr.decode(errors='ignore') or '').lower()
+        stderr = (cp.stderr or '').lower()
         # Idempotence guard: tolerate already-enabled state
         if 'already enabled' in stderr or 'replication is already enabled' in stderr:
             module.exit_json(changed=False, enabled=True)
@@ -167,7 +223,7 @@ def run_module():
             module.fail_json(
                 msg="Replica conflict detected - stale replication state in memory. Restart the instance to clear state.",
                 rc=cp.returncode, 
-                stderr=cp.stderr.decode(errors='ignore'),
+                stderr=cp.stderr,
                 suggestion="Restart the 389-DS instance to clear stale replication state"
             )
         # Handle generation ID mismatch
@@ -175,15 +231,76 @@ def run_module():
             module.fail_json(
                 msg="Generation ID mismatch detected - replicas have inconsistent database states",
                 rc=cp.returncode,
-                stderr=cp.stderr.decode(errors='ignore'),
+                stderr=cp.stderr,
                 suggestion="Check replica initialization order and ensure consistent database states"
             )
-        module.fail_json(msg="dsconf replication enable failed", rc=cp.returncode, stderr=cp.stderr.decode(errors='ignore'))
+        module.fail_json(msg="dsconf replication enable failed", rc=cp.returncode, stderr=cp.stderr)
+
+
+def run_module():
+    args_spec = dict(
+        instance=dict(type='str', required=True),
+        suffix=dict(type='str', required=True),
+        role=dict(type='str', required=True, choices=['supplier', 'hub', 'consumer']),
+        replica_id=dict(type='int', required=False),
+        use_ldapi=dict(type='bool', default=True),
+        conn_url=dict(type='str', required=False),
+        dm_dn=dict(type='str', required=False),
+        dm_pw=dict(type='str', required=False, no_log=True),
+        op_timeout=dict(type='int', default=30),
+        verify_after=dict(type='bool', default=False),
+    )
+
+    module = AnsibleModule(argument_spec=args_spec, supports_check_mode=True)
+    p = module.params
+
+    if p['role'] == 'supplier' and not p.get('replica_id'):
+        module.fail_json(msg="replica_id is required for role=supplier")
+
+    # Pre-check over LDAP; without a reachable LDAP endpoint fall back to dsconf
+    client = _ldap_client(p)
+    if client is not None:
+        try:
+            enabled, details = _get_state_ldap(client, p)
+        except dsldap.DsLdapError:
+            client = None
+    # dsconf argv prefix, built once and shared by the fallback pre-check, enable and post-check
+    base = _dsconf_base(p) if client is None else None
+    if client is None:
+        enabled, details = _get_state(base, p)
+    if enabled:
+        module.exit_json(changed=False, enabled=True, details=details)
+
+    if module.check_mode:
+        module.exit_json(changed=True, enabled=True)
+
+    # A consumer is just its replica entry; suppliers and hubs need the changelog and checks dsconf adds
+    if client is not None and p['role'] == 'consumer':
+        try:
+            changed = _enable_ldap(client, p)
+        except dsldap.DsLdapError as e:
+            if e.code == 32:
+                module.fail_json(msg=f"No mapping tree entry for suffix {p['suffix']}; create the backend first", hint=e.hint)
+            module.fail_json(msg="Failed to add replica entry", rc=e.code, hint=e.hint)
+        if not changed:
+            module.exit_json(changed=False, enabled=True)
+    else:
+        _enable_dsconf(module, base or _dsconf_base(p), p)
+
+    if not p['verify_after']:
+        details2 = dict(replica_type=_ROLE_REPLICA[p['role']][0], replica_id=_replica_id(p))
+        module.exit_json(changed=True, enabled=True, details=details2)
 
     # Post-check
-    enabled2, details2 = _get_state(module, p)
+    if client is not None:
+        try:
+            enabled2, details2 = _get_state_ldap(client, p)
+        except dsldap.DsLdapError as e:
+            module.fail_json(msg="Failed to re-read replica entry", hint=e.hint)
+    else:
+        enabled2, details2 = _get_state(base, p)
     if not enabled2:
-        module.fail_json(msg="Replication not enabled after dsconf run")
+        module.fail_json(msg="Replication not enabled after enable")
 
     module.exit_json(changed=True, enabled=True, details=details2)
 
@@ -80,6 +80,13 @@ options:
     description: Timeout seconds for the monitor command.
     type: int
     default: 10
+  detail:
+    description:
+      - Request the full agreement attribute set (host, port, bind DN, update start).
+      - When false only the attributes the summary needs (including init status) are read; the omitted agreement
+        fields are returned as null.
+    type: bool
+    default: true
 '''
 
 EXAMPLES = r'''
@@ -130,60 +137,107 @@ summary:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-import re
-from datetime import datetime, timezone
 import json
+import re
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, Optional
 
-try:
-    from ansible_collections.directories.ds.plugins.module_utils import dsldap
-except Exception:  # pragma: no cover
-    import importlib.util
-    import sys
-    import pathlib
-    _p = pathlib.Path(__file__).resolve().parents[3] / 'module_utils' / 'dsldap.py'
-    spec = importlib.util.spec_from_file_location('dsldap', str(_p))
-    dsldap = importlib.util.module_from_spec(spec)
-    sys.modules[spec.name] = dsldap
-    spec.loader.exec_module(dsldap)
-
-_CODE_RE = re.compile(r"^(-?\d+)")
-
-
-def _gtz_to_epoch(value):
-    if not isinstance(value, str):
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
+
+
+# Replica and agreement attributes the summary needs; _DETAIL_ATTRS only feed the per-agreement report
+_LEAN_ATTRS = (
+    'objectClass', 'cn', 'nsds5ReplicaEnabled', 'nsds50ruv',
+    'nsds5ReplicaUpdateInProgress', 'nsds5replicaLastUpdateStatus', 'nsds5replicaLastUpdateEnd',
+    'nsds5replicaLastInitStatus', 'nsds5replicaLastInitEnd', 'nsds5replicaLastInitStatusJSON',
+)
+# (lowercased attribute, agreement key, converter applied to a non-empty value)
+_ATTR_MAP = (
+    ('nsds5replicahost', 'host', None),
+    ('nsds5replicaport', 'port', int),
+    ('nsds5replicabinddn', 'bind_dn', None),
+    ('nsds5replicalastinitstatus', 'last_init_status', None),
+    ('nsds5replicalastinitend', 'last_init_end', None),
+    ('nsds5replicalastupdatestatus', 'last_update_status', None),
+    ('nsds5replicalastupdatestart', 'last_update_start', None),
+    ('nsds5replicalastupdateend', 'last_update_end', None),
+)
+# (timestamp key, epoch key) derived after the raw values are read
+_EPOCH_MAP = (
+    ('last_init_end', 'last_init_epoch'),
+    ('last_update_start', 'last_update_start_epoch'),
+    ('last_update_end', 'last_update_epoch'),
+)
+_DETAIL_ATTRS = ('nsds5ReplicaHost', 'nsds5ReplicaPort', 'nsds5ReplicaBindDN', 'nsds5replicaLastUpdateStart')
+# Simple Paged Results page size so many agreements never hit nsslapd-sizelimit in one response
+_PAGE_SIZE = 100
+# Time, size and admin limit exceeded: the server refused the combined search, not the replica read itself
+_LIMIT_CODES = frozenset((3, 4, 11))
+
+
+def _leading_int(s):
+    """Status code at the start of e.g. '0 Total init succeeded', or None."""
+    if not isinstance(s, str):
         return None
-    m = re.match(r"^(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})(?:\.\d+)?Z$", value)
-    if not m:
+    # split(None, 1) also skips leading whitespace, so ' 0 Update OK' still yields 0
+    tok = s.split(None, 1)
+    if not tok:
         return None
     try:
-        y, mo, d, h, mi, s = (int(m.group(i)) for i in range(1, 7))
-        dt = datetime(y, mo, d, h, mi, s, tzinfo=timezone.utc)
-        return int(dt.timestamp())
-    except Exception:
+        return int(tok[0])
+    except ValueError:
         return None
 
 
-def _escape_suffix_value(suffix_dn):
-    return suffix_dn.replace('=', '\\3D').replace(',', '\\2C')
-
-
 def _first(vals):
     if isinstance(vals, list) and vals:
         return vals[0]
     return None
 
 
-def _aget(attrs, name):
-    """Case-insensitive attribute getter from parsed LDIF attrs dict."""
-    if not isinstance(attrs, dict):
-        return None
-    lname = name.lower()
-    for k, v in attrs.items():
-        if isinstance(k, str) and k.lower() == lname:
-            return v
-    return None
+def _enrich(dn_val, cn_val, a_lc):
+    """Build one agreement's report dict from its lowercased attribute index."""
+    ag = dict(dn=dn_val, name=cn_val)
+    g = a_lc.get
+    for lname, key, post in _ATTR_MAP:
+        vals = g(lname)
+        v = vals[0] if vals else None
+        ag[key] = (post(v) if v else None) if post else v
+    for src, key in _EPOCH_MAP:
+        ag[key] = dsldap.generalized_time_to_epoch(ag[src]) if ag[src] else None
+    init_status = ag['last_init_status']
+    init_code = ag['last_init_code'] = _leading_int(init_status)
+    ag['last_update_code'] = _leading_int(ag['last_update_status'])
+    # Busy flag (agreement-scoped)
+    vals = g('nsds5replicaupdateinprogress')
+    busy = vals[0].strip().lower() in ('true', 'yes', 'on', '1') if vals else None
+    # Derive init_status label; a 0 init code is final, so the JSON status is only parsed otherwise
+    init_status_label = 'Done' if init_code == 0 else None
+    vals = None if init_status_label else g('nsds5replicalastinitstatusjson')
+    init_json_raw = vals[0] if vals else None
+    if init_json_raw:
+        try:
+            init_json = json.loads(init_json_raw)
+        except Exception:
+            init_json = None
+        if isinstance(init_json, dict):
+            initialized = init_json.get('initialized')
+            state = init_json.get('state')
+            if isinstance(initialized, bool):
+                init_status_label = 'Done' if initialized else 'Unknown'
+            elif isinstance(state, str):
+                # e.g., green/unknown
+                st = state.lower()
+                init_status_label = 'Done' if st in ('green', 'succeeded', 'success') else st.title()
+    if not init_status_label and isinstance(init_status, str) and init_status:
+        init_status_label = 'Unknown'
+    # Agreement's own enabled status; present-but-empty counts as disabled
+    vals = g('nsds5replicaenabled')
+    agmt_enabled = None if vals is None else (vals[0] if vals else '').lower() in ('on', 'true', 'yes', '1')
+    ag.update(enabled=agmt_enabled, busy=busy, init_status=init_status_label, backlog=None)
+    return ag
 
 
 def run_module():
@@ -205,19 +259,23 @@ def run_module():
         stale_seconds=dict(type='int', default=120),
         monitor=dict(type='bool', default=True),
         monitor_timeout=dict(type='int', default=10),
+        detail=dict(type='bool', default=True),
     )
 
     module = AnsibleModule(argument_spec=args_spec, supports_check_mode=True)
 
     p = module.params
+    # Bind the parameters used more than once to locals up front
+    instance, suffix = p['instance'], p['suffix']
+    ldaps_host, ldaps_port, bind_dn, bind_pw = p.get('ldaps_host'), p.get('ldaps_port'), p.get('bind_dn'), p.get('bind_pw')
     conn = dsldap.LdapConnParams(
-        instance=p['instance'],
+        instance=instance,
         use_ldapi=p['use_ldapi'],
-        ldaps_host=p.get('ldaps_host'),
-        ldaps_port=p.get('ldaps_port'),
+        ldaps_host=ldaps_host,
+        ldaps_port=ldaps_port,
         bind_method=p.get('bind_method'),
-        bind_dn=p.get('bind_dn'),
-        bind_pw=p.get('bind_pw'),
+        bind_dn=bind_dn,
+        bind_pw=bind_pw,
         tls_ca=p.get('tls_ca'),
         tls_client_cert=p.get('tls_client_cert'),
         tls_client_key=p.get('tls_client_key'),
@@ -226,210 +284,175 @@ def run_module():
     )
     client = dsldap.DsLdap(conn)
 
-    esc_suffix = _escape_suffix_value(p['suffix'])
-    replica_dn = f"cn=replica,cn={esc_suffix},cn=mapping tree,cn=config"
+    replica_dn = dsldap.replica_dn(suffix)
 
+    # One subtree search returns the replica entry and its agreements; split them by objectClass
+    search_attrs = _LEAN_ATTRS + _DETAIL_ATTRS if p['detail'] else _LEAN_ATTRS
     try:
-        rep = client.search_one(replica_dn, 'base', '(objectClass=*)', ['nsds5ReplicaEnabled', 'nsds50ruv'])
+        found = client.search(
+            replica_dn, 'sub', '(|(objectClass=nsDS5Replica)(objectClass=nsDS5ReplicationAgreement))', search_attrs,
+            page_size=_PAGE_SIZE,
+        )
     except dsldap.DsLdapError as e:
-        module.fail_json(msg=f"Replica entry missing for suffix {p['suffix']}", hint=getattr(e, 'hint', None))
+        if e.code == 32:
+            module.fail_json(msg=f"Replica entry missing for suffix {suffix}", hint=getattr(e, 'hint', None))
+        if e.code not in _LIMIT_CODES:
+            module.fail_json(msg=f"Failed to read replication state for suffix {suffix}: {e}", rc=e.code, hint=getattr(e, 'hint', None))
+        # Combined search refused by a limit; fall back to a base plus a one-level search
+        try:
+            found = [client.search_one(replica_dn, 'base', '(objectClass=*)', search_attrs)]
+            found += client.search(
+                replica_dn, 'one', '(objectClass=nsDS5ReplicationAgreement)', search_attrs, page_size=_PAGE_SIZE,
+            )
+        except dsldap.DsLdapError as e2:
+            if e2.code == 32:
+                module.fail_json(msg=f"Replica entry missing for suffix {suffix}", hint=getattr(e2, 'hint', None))
+            module.fail_json(msg=f"Failed to read replication state for suffix {suffix}: {e2}", rc=e2.code, hint=getattr(e2, 'hint', None))
+
+    rep_lc = None
+    entries = []
+    for e in found:
+        a_lc = dsldap.lc_index(e.get('attrs'))
+        if 'nsds5replica' in [v.lower() for v in (a_lc.get('objectclass') or [])]:
+            rep_lc = a_lc
+        else:
+            entries.append((e, a_lc))
+    if rep_lc is None:
+        module.fail_json(msg=f"Replica entry missing for suffix {suffix}")
 
-    attrs = rep.get('attrs', {})
     rep_enabled = None
-    if 'nsds5ReplicaEnabled' in attrs:
-        rep_enabled = (_first(attrs['nsds5ReplicaEnabled']) or '').lower() in ('on', 'true', 'yes', '1')
+    if 'nsds5replicaenabled' in rep_lc:
+        rep_enabled = (_first(rep_lc['nsds5replicaenabled']) or '').lower() in ('on', 'true', 'yes', '1')
     result_replica = dict(
         dn=replica_dn,
         enabled=rep_enabled,
-        ruv=_first(attrs.get('nsds50ruv')),
+        ruv=_first(rep_lc.get('nsds50ruv')),
     )
 
-    try:
-        entries = client.search(replica_dn, 'one', '(objectClass=nsDS5ReplicationAgreement)', [
-            'cn',
-            'nsds5ReplicaHost', 'nsds5ReplicaPort', 'nsds5ReplicaBindDN', 'nsds5ReplicaEnabled',
-            'nsds5replicaLastInitStatus', 'nsds5replicaLastInitEnd', 'nsds5replicaLastInitStatusJSON',
-            'nsds5replicaLastUpdateStatus', 'nsds5replicaLastUpdateStart', 'nsds5replicaLastUpdateEnd', 'nsds5replicaLastUpdateStatusJSON',
-            'nsds5ReplicaUpdateInProgress'
-        ])
-    except Exception:
-        entries = []
-
-    # Optional filter by agreement names or DNs
-    filters = set(p.get('agreements') or [])
+    # Optional filter by agreement names or DNs, lowercased once
+    # One case-insensitive alternation of the name tokens, searched once per CN/DN instead of a token loop
+    tokens = sorted({str(f) for f in (p.get('agreements') or [])})
+    filter_re = re.compile('|'.join(map(re.escape, tokens)), re.IGNORECASE) if tokens else None
 
     # Best-effort backlog sampling via dsconf -j replication monitor (LDAPI only unless bind provided)
     def _dsconf_monitor() -> Optional[Dict[str, Any]]:
         if not p.get('monitor'):
             return None
-        argv = None
-        # Try LDAPI first using the instance socket; prefer /run then /data/run
-        try_urls = [
-            dsldap.build_ldapi_url(p['instance'], "/run"),
-            dsldap.build_ldapi_url(p['instance'], "/data/run"),
-        ]
-        for url in try_urls:
-            argv = ["dsconf", "-j", url, "replication", "monitor", "--suffix", p['suffix']]
-            try:
-                cp = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=int(p.get('monitor_timeout', 10)))
-                if cp.returncode == 0 and cp.stdout:
-                    return json.loads(cp.stdout)
-            except Exception:
-                continue
-        # Fallback to LDAPS if host + bind provided
-        if p.get('ldaps_host') and p.get('bind_dn') and p.get('bind_pw'):
-            url = f"ldaps://{p['ldaps_host']}:{p.get('ldaps_port', 636)}"
-            argv = ["dsconf", "-j", "-H", url, "ldap", "-D", p['bind_dn'], "-w", p['bind_pw'], "replication", "monitor", "--suffix", p['suffix']]
-            try:
-                cp = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=int(p.get('monitor_timeout', 10)))
-                if cp.returncode == 0 and cp.stdout:
-                    return json.loads(cp.stdout)
-            except Exception:
-                pass
-        return None
+        timeout = int(p.get('monitor_timeout', 10))
 
-    mon_json = _dsconf_monitor()
-
-    def _extract_backlogs(obj) -> Dict[str, int]:
-        out: Dict[str, int] = {}
-        def _walk(x):
-            if isinstance(x, dict):
-                nm = None
-                if 'name' in x and isinstance(x['name'], str):
-                    nm = x['name']
-                # any key containing 'backlog'
-                bl = None
-                for k, v in x.items():
-                    if isinstance(k, str) and 'backlog' in k.lower():
-                        try:
-                            bl = int(v)
-                        except Exception:
-                            pass
-                if nm and isinstance(bl, int):
-                    out[nm] = bl
-                for v in x.values():
-                    _walk(v)
-            elif isinstance(x, list):
-                for it in x:
-                    _walk(it)
-        _walk(obj)
-        return out
-
-    backlog_by_name: Dict[str, int] = _extract_backlogs(mon_json) if mon_json else {}
+        def _collect(proc):
+            try:
+                out, _err = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                return None
+            if proc.returncode == 0 and out:
+                try:
+                    return json.loads(out)
+                except ValueError:
+                    return None
+            return None
 
+        def _race(argvs):
+            procs = []
+            for argv in argvs:
+                try:
+                    procs.append(subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True))
+                except OSError:
+                    continue
+            if not procs:
+                return None
+            result = None
+            with ThreadPoolExecutor(max_workers=len(procs)) as pool:
+                futures = [pool.submit(_collect, proc) for proc in procs]
+                for fut in as_completed(futures):
+                    result = fut.result()
+                    if result is not None:
+                        break
+                # First success wins; stop the slower attempts so the pool does not wait on them
+                for proc in procs:
+                    if proc.poll() is None:
+                        proc.kill()
+            return result
+
+        # LDAPI on both socket paths, raced in parallel
+        result = _race([
+            ["dsconf", "-j", dsldap.build_ldapi_url(instance, base), "replication", "monitor", "--suffix", suffix]
+            for base in ("/run", "/data/run")
+        ])
+        # LDAPS only once LDAPI has failed: it puts the bind password on dsconf's argv
+        if result is None and ldaps_host and bind_dn and bind_pw:
+            url = f"ldaps://{ldaps_host}:{ldaps_port or 636}"
+            result = _race([["dsconf", "-j", "-H", url, "ldap", "-D", bind_dn, "-w", bind_pw, "replication", "monitor", "--suffix", suffix]])
+        return result
+
+    # Sequential on purpose: _enrich is pure-Python dict and regex work, so threads would only contend on
+    # the GIL, and a process pool's fork/pickle cost exceeds the microseconds each agreement takes
     agmts = []
-    for e in entries:
-        a = e.get('attrs', {})
-        cn_val = _first(_aget(a, 'cn'))
+    for e, a_lc in entries:
+        cn_val = _first(a_lc.get('cn'))
         dn_val = e.get('dn', '')
-        if filters:
-            # Accept match if CN matches any token or DN matches any token
-            matched = any(
-                (
-                    (cn_val and f"{f}".lower() in cn_val.lower()) or
-                    (dn_val and f"{f}".lower() in dn_val.lower())
-                ) for f in filters
-            )
-            if not matched:
-                continue
-        init_status = _first(_aget(a, 'nsds5replicaLastInitStatus'))
-        upd_status = _first(_aget(a, 'nsds5replicaLastUpdateStatus'))
-        init_match = _CODE_RE.match(init_status) if isinstance(init_status, str) else None
-        upd_match = _CODE_RE.match(upd_status) if isinstance(upd_status, str) else None
-        init_code = int(init_match.group(1)) if init_match else None
-        upd_code = int(upd_match.group(1)) if upd_match else None
-        init_end = _first(_aget(a, 'nsds5replicaLastInitEnd'))
-        upd_end = _first(_aget(a, 'nsds5replicaLastUpdateEnd'))
-        upd_start = _first(_aget(a, 'nsds5replicaLastUpdateStart'))
-        # Busy flag (agreement-scoped)
-        busy_raw = _first(_aget(a, 'nsds5ReplicaUpdateInProgress'))
-        busy = None
-        if isinstance(busy_raw, str):
-            busy = busy_raw.strip().lower() in ('true', 'yes', 'on', '1')
-        # JSON init status hints (if present)
-        init_json_raw = _first(_aget(a, 'nsds5replicaLastInitStatusJSON'))
-        init_json = None
-        try:
-            init_json = json.loads(init_json_raw) if init_json_raw else None
-        except Exception:
-            init_json = None
-        # Derive init_status label
-        init_status_label = None
-        if isinstance(init_json, dict):
-            if isinstance(init_json.get('initialized'), bool):
-                init_status_label = 'Done' if init_json.get('initialized') else 'Unknown'
-            elif isinstance(init_json.get('state'), str):
-                # e.g., green/unknown
-                st = init_json.get('state').lower()
-                init_status_label = 'Done' if st in ('green', 'succeeded', 'success') else st.title()
-        if not init_status_label and isinstance(init_status, str):
-            if init_code == 0:
-                init_status_label = 'Done'
-            elif init_status:
-                init_status_label = 'Unknown'
-        # Agreement enabled status
-        # Check agreement's own enabled status
-        agmt_enabled = None
-        vals_en = _aget(a, 'nsds5ReplicaEnabled')
-        if vals_en is not None:
-            agmt_enabled = (_first(vals_en) or '').lower() in ('on', 'true', 'yes', '1')
-        agmts.append(dict(
-            dn=dn_val,
-            name=cn_val,
-            host=_first(_aget(a, 'nsds5ReplicaHost')),
-            port=(int(_first(_aget(a, 'nsds5ReplicaPort'))) if _first(_aget(a, 'nsds5ReplicaPort')) else None),
-            bind_dn=_first(_aget(a, 'nsds5ReplicaBindDN')),
-            enabled=agmt_enabled,
-            busy=busy,
-            init_status=init_status_label,
-            last_init_status=init_status,
-            last_init_code=init_code,
-            last_init_end=init_end,
-            last_init_epoch=_gtz_to_epoch(init_end) if init_end else None,
-            last_update_status=upd_status,
-            last_update_code=upd_code,
-            last_update_start=upd_start,
-            last_update_start_epoch=_gtz_to_epoch(upd_start) if upd_start else None,
-            last_update_end=upd_end,
-            last_update_epoch=_gtz_to_epoch(upd_end) if upd_end else None,
-            backlog=(backlog_by_name.get(cn_val) if cn_val and cn_val in backlog_by_name else None),
-        ))
-
-    # Compute summary
-    problems = []
-    configured = any((a.get('enabled') is True) for a in agmts)
+        # Accept match if CN matches any token or DN matches any token
+        if filter_re is not None and not (filter_re.search(cn_val or '') or filter_re.search(dn_val or '')):
+            continue
+        agmts.append(_enrich(dn_val, cn_val, a_lc))
+
+    # Backlog only matters for enabled agreements that survived the filter; skip the monitor otherwise
+    if any(a.get('enabled') is True for a in agmts):
+        mon_json = _dsconf_monitor()
+        wanted = {a['name'] for a in agmts if a['name']}
+        backlog_by_name: Dict[str, int] = dsldap.extract_backlogs(mon_json, wanted) if mon_json else {}
+        for a in agmts:
+            if a['name'] and a['name'] in backlog_by_name:
+                a['backlog'] = backlog_by_name[a['name']]
+
+    # Compute summary in a single pass over the agreements
+    problems = set()
+    now = int(time.time())
+    stale = p.get('stale_seconds') or 120
+    configured = any_busy = recent_ok = False
+    # Finished: no busy, successful init (if observed), recent_ok for all and, where exposed, 0 backlog
+    none_busy = init_ok = all_recent_ok = backlog_ok = bool(agmts)
+    hints = []
+    for a in agmts:
+        busy = a.get('busy')
+        upd_code = a.get('last_update_code')
+        upd_epoch = a.get('last_update_epoch')
+        is_recent = upd_code == 0 and upd_epoch is not None and (now - upd_epoch) <= stale
+        if a.get('enabled') is True:
+            configured = True
+        if busy is True:
+            any_busy = True
+            none_busy = False
+        elif busy is not False and busy is not None:
+            none_busy = False
+        if is_recent:
+            recent_ok = True
+        else:
+            all_recent_ok = False
+        if not (a.get('last_init_code') in (None, 0) or a.get('init_status') in ('Done', 'Completed')):
+            init_ok = False
+        backlog = a.get('backlog')
+        if backlog is not None and backlog != 0:
+            backlog_ok = False
+        # Per-agreement hints, reported only when nothing is working
+        tag = (a.get('name') or a.get('dn', '(agmt)')).split(',')[0]
+        if upd_code not in (None, 0):
+            hints.append(f"{tag}: update failed (code {upd_code})")
+        elif upd_epoch is None:
+            hints.append(f"{tag}: no update timestamp observed")
+        elif now - upd_epoch > stale:
+            hints.append(f"{tag}: last update stale >{stale}s")
     if not configured:
-        problems.append('No enabled agreements for suffix')
+        problems.add('No enabled agreements for suffix')
     # Working: any busy, or any recent successful update
-    now = int(datetime.now(tz=timezone.utc).timestamp())
-    stale = int(p.get('stale_seconds') or 120)
-    recent_ok = any((
-        (a.get('last_update_code') == 0) and (a.get('last_update_epoch') is not None) and ((now - int(a['last_update_epoch'])) <= stale)
-    ) for a in agmts)
-    any_busy = any((a.get('busy') is True) for a in agmts)
     working = any_busy or recent_ok
-    if not working and agmts:
-        # Provide hints per agreement
-        for a in agmts:
-            if a.get('last_update_code') not in (None, 0):
-                problems.append(f"{(a.get('name') or a.get('dn','(agmt)')).split(',')[0]}: update failed (code {a.get('last_update_code')})")
-            elif a.get('last_update_epoch') is None:
-                problems.append(f"{(a.get('name') or a.get('dn','(agmt)')).split(',')[0]}: no update timestamp observed")
-            else:
-                age = now - int(a['last_update_epoch'])
-                if age > stale:
-                    problems.append(f"{(a.get('name') or a.get('dn','(agmt)')).split(',')[0]}: last update stale >{stale}s")
-    # Finished: no busy, successful init (if observed), and recent_ok for all
-    none_busy = all(((a.get('busy') is False) or (a.get('busy') is None)) for a in agmts) if agmts else False
-    init_ok = all((a.get('last_init_code') in (None, 0) or (a.get('init_status') in ('Done', 'Completed'))) for a in agmts) if agmts else False
-    all_recent_ok = all((
-        (a.get('last_update_code') == 0) and (a.get('last_update_epoch') is not None) and ((now - int(a['last_update_epoch'])) <= stale)
-    ) for a in agmts) if agmts else False
-    # If backlog is exposed, also require 0 backlog across agreements (only for those with a value)
-    backlog_ok = all(((a.get('backlog') is None) or (int(a.get('backlog')) == 0)) for a in agmts) if agmts else False
+    if not working:
+        problems.update(hints)
     finished = bool(none_busy and init_ok and all_recent_ok and backlog_ok)
 
-    summary = dict(configured=bool(configured), working=bool(working), finished=bool(finished), problems=sorted(set(problems)))
+    summary = dict(configured=bool(configured), working=bool(working), finished=bool(finished), problems=sorted(problems))
 
     module.exit_json(changed=False, replica=result_replica, agreements=agmts, summary=summary)
 
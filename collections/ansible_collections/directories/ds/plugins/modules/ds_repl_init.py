@@ -12,6 +12,8 @@ version_added: "1.0.0"
 author: directories.ds (@directories-ds)
 description:
   - Runs C(dsconf repl-agmt init) for a given agreement under a suffix and optionally waits for success.
+  - Without C(conn_url), progress is polled by reading the agreement entry over one reused LDAPI connection;
+    with C(conn_url), or if LDAPI is unavailable, C(dsconf repl-agmt init-status) is polled instead.
 options:
   instance:
     description: 389-DS instance name.
@@ -34,7 +36,7 @@ options:
     type: int
     default: 600
   poll_interval:
-    description: Seconds between status polls.
+    description: Maximum seconds between status polls; polls start at 0.5s and back off exponentially up to this value.
     type: int
     default: 5
   conn_url:
@@ -74,9 +76,26 @@ status:
 
 
 from ansible.module_utils.basic import AnsibleModule
+import json
+import random
+import re
 import subprocess
 import time
 
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
+
+
+# dsconf init-status success markers (borrowed from the role's wait logic), matched on raw stdout
+_INIT_DONE_RE = re.compile(rb'successfully initialized|total init succeeded', re.I)
+# Any error other than the 'Error (0)' prefix dsconf puts on successful statuses
+_INIT_ERROR_RE = re.compile(rb'error(?! \(0\))', re.I)
+_NS = 1_000_000_000
+
+
+def _text(out):
+    return out.decode('utf-8', errors='ignore') if isinstance(out, bytes) else out
+
+
 def _run(argv, timeout=60):
     return subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
 
@@ -94,11 +113,45 @@ def _base(params):
     return base
 
 
-def _status(params, timeout):
-    base = _base(params)
-    argv = base + ["repl-agmt", "init-status", "--suffix", params['suffix'], params['agreement']]
-    cp = _run(argv, timeout=timeout)
-    return cp
+def _status_argv(base, params):
+    # -j asks for structured output instead of the human-readable status line
+    return base[:1] + ["-j"] + base[1:] + ["repl-agmt", "init-status", "--suffix", params['suffix'], params['agreement']]
+
+
+def _status_output(raw):
+    """Return the string values of a `dsconf -j` document as lines; non-JSON output passes through."""
+    if not raw.lstrip().startswith((b'{', b'[')):
+        return raw
+    try:
+        doc = json.loads(raw)
+    except ValueError:
+        return raw
+    leaves = []
+    stack = [doc]
+    while stack:
+        x = stack.pop()
+        if isinstance(x, dict):
+            # lib389 wraps results as {"type": ..., "items": ...}; the type tag is not status text
+            stack.extend(v for k, v in x.items() if k != 'type')
+        elif isinstance(x, list):
+            stack.extend(reversed(x))
+        elif isinstance(x, str):
+            leaves.append(x)
+    return '\n'.join(leaves).encode('utf-8')
+
+
+def _ldap_status(client, agmt_dn):
+    """Return (done, status text) from the agreement entry.
+
+    nsds5BeginReplicaRefresh stays set while a total update is running; once the server clears it,
+    nsds5replicaLastInitStatus holds the outcome (e.g. 'Error (0) Total update succeeded').
+    """
+    e = client.search_one(agmt_dn, 'base', '(objectClass=*)', ['nsds5BeginReplicaRefresh', 'nsds5replicaLastInitStatus'])
+    attrs = {k.lower(): v for k, v in e.get('attrs', {}).items()}
+    # The attribute's presence, with any value or case, means a refresh is still in flight (as lib389 reads it)
+    refreshing = 'nsds5beginreplicarefresh' in attrs
+    status = (attrs.get('nsds5replicalastinitstatus') or [''])[0]
+    return not refreshing and 'succeeded' in status.lower(), status
 
 
 def run_module():
@@ -121,40 +174,76 @@ def run_module():
     if module.check_mode:
         module.exit_json(changed=True)
 
+    # Parameters the poll loop reads every round, looked up (and the dsconf argv built) once
+    op_timeout = p.get('op_timeout', 60)
     base = _base(p)
     argv = base + ["repl-agmt", "init", "--suffix", p['suffix'], p['agreement']]
-    cp = _run(argv, timeout=p.get('op_timeout', 60))
+    cp = _run(argv, timeout=op_timeout)
     if cp.returncode != 0:
         module.fail_json(msg="dsconf repl-agmt init failed", rc=cp.returncode, stderr=cp.stderr.decode(errors='ignore'))
 
     if not p.get('wait', True):
         module.exit_json(changed=True)
 
-    # Poll for success with progress reporting
-    end_by = time.time() + int(p.get('timeout', 600))
+    # Poll for success with progress reporting; LDAPI reads reuse one connection, dsconf is the fallback
+    client = None
+    if not p.get('conn_url'):
+        client = dsldap.DsLdap(dsldap.LdapConnParams(instance=p['instance'], use_ldapi=True, op_timeout=op_timeout))
+    agmt_dn = f"cn={p['agreement']},{dsldap.replica_dn(p['suffix'])}"
+    status_argv = _status_argv(base, p)
+    start_ns = time.monotonic_ns()
+    end_by = start_ns + int(p.get('timeout', 600)) * _NS
     last_out = ''
     poll_count = 0
-    start_time = time.time()
-
-    while time.time() < end_by:
-        poll_count += 1
-        elapsed = time.time() - start_time
-
-        st = _status(p, timeout=p.get('op_timeout', 60))
-        out = st.stdout.decode('utf-8', errors='ignore')
-        last_out = out
-
-        # Log progress every 10 polls or when status changes
-        if poll_count % 10 == 0 or 'error' in out.lower():
-            module.warn(f"ds_repl_init: poll={poll_count} elapsed={elapsed:.1f}s status='{out.strip()}'")
-
-        # success indicators borrowed from role's wait logic
-        low = out.lower()
-        if ('successfully initialized' in low) or ('total init succeeded' in low):
-            module.exit_json(changed=True, status=out, polls=poll_count, elapsed_seconds=elapsed)
-        time.sleep(int(p.get('poll_interval', 5)))
-
-    module.fail_json(msg='Timeout waiting for successful initialization', status=last_out)
+    # Quick first re-check, then exponential backoff capped at poll_interval
+    first_delay = 0.5
+    max_delay = float(p.get('poll_interval', 5))
+
+    # exit_json/fail_json leave through SystemExit, so the finally unbinds the LDAPI connection on every path
+    try:
+        while True:
+            # One clock read per poll; monotonic so a wall-clock step cannot cut the wait short, and integer
+            # nanoseconds as in ds_repl_wait so the deadline comparison is exact
+            now = time.monotonic_ns()
+            if now >= end_by:
+                break
+            poll_count += 1
+            elapsed = (now - start_ns) / _NS
+
+            done = False
+            out = None
+            if client is not None:
+                try:
+                    done, out = _ldap_status(client, agmt_dn)
+                except dsldap.DsLdapError as e:
+                    module.warn(f"ds_repl_init: LDAPI status read failed ({e}); falling back to dsconf")
+                    client.close()
+                    client = None
+            if out is None:
+                # Scan the raw bytes; the text is only decoded when it is reported
+                out = _status_output(_run(status_argv, timeout=op_timeout).stdout)
+                done = _INIT_DONE_RE.search(out) is not None
+                noisy = _INIT_ERROR_RE.search(out) is not None
+            else:
+                low = out.lower()
+                noisy = 'error' in low and 'error (0)' not in low
+            last_out = out
+
+            # Log progress every 10 polls or when status changes
+            if poll_count % 10 == 0 or noisy:
+                module.warn(f"ds_repl_init: poll={poll_count} elapsed={elapsed:.1f}s status='{_text(out).strip()}'")
+
+            if done:
+                module.exit_json(changed=True, status=_text(out), polls=poll_count, elapsed_seconds=elapsed)
+            # Closed form from the poll count (exponent bounded so a long wait cannot overflow the float); the jitter
+            # only goes on this sleep, so it never compounds into later delays
+            delay = min(first_delay * 2 ** min(poll_count - 1, 16), max_delay) + random.uniform(0, 0.25)
+            time.sleep(min(delay, max(0.0, (end_by - now) / _NS)))
+    finally:
+        if client is not None:
+            client.close()
+
+    module.fail_json(msg='Timeout waiting for successful initialization', status=_text(last_out))
 
 
 if __name__ == '__main__':
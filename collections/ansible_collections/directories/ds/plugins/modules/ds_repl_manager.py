@@ -12,9 +12,16 @@ version_added: "1.0.0"
 author: directories.ds (@directories-ds)
 description:
   - Ensures C(cn=replication manager,cn=config) exists and optionally sets C(userPassword).
-  - Tries to verify password via simple bind over LDAPI before changing.
+  - Tries to verify password with an LDAP compare on C(userPassword), then via simple bind over LDAPI before
+    changing (in-process with python-ldap when available, otherwise with C(ldapwhoami)).
 options:
-  instance: {description: Instance name, type: str, required: true}
+  instance: {description: Instance name; exactly one of I(instance) or I(instances) is required, type: str}
+  instances:
+    description:
+      - Instance names to converge in one module run, one LDAPI connection after another.
+      - Mutually exclusive with I(instance).
+    type: list
+    elements: str
   name: {description: Manager common name, type: str, default: replication manager}
   ensure: {description: Target state, type: str, choices: [present, absent], default: present}
   password: {description: Desired password (when present), type: str}
@@ -27,6 +34,11 @@ EXAMPLES = r'''
   directories.ds.ds_repl_manager:
     instance: "slapd-example"
     password: "{{ vault_repl_password }}"
+
+- name: Converge the replication manager on every instance of this host in one call
+  directories.ds.ds_repl_manager:
+    instances: ["slapd-a", "slapd-b"]
+    password: "{{ vault_repl_password }}"
 '''
 
 RETURN = r'''
@@ -38,23 +50,44 @@ dn:
   description: Manager DN
   returned: always
   type: str
+results:
+  description: Per-instance outcome, one item per I(instances) entry
+  returned: when instances is set
+  type: list
+  elements: dict
+  sample: [{instance: slapd-a, changed: false, dn: "cn=replication manager,cn=config"}]
 '''
 
 
 from ansible.module_utils.basic import AnsibleModule
+import os
 import subprocess
+from urllib.parse import unquote
+
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
+
+
+def _bind_ok(url: str, dn: str, pw: str, timeout: int) -> bool:
+    """Simple bind in-process with python-ldap; falls back to ldapwhoami when it is unavailable."""
+    if not dsldap.HAS_PYTHON_LDAP or os.environ.get("DSLDAP_FORCE_CLI") == "1":
+        return _ldapwhoami_try(url, dn, pw, timeout)
+    ldap = dsldap.ldap
+    conn = None
+    try:
+        conn = ldap.initialize(url)
+        conn.set_option(ldap.OPT_NETWORK_TIMEOUT, timeout)
+        conn.set_option(ldap.OPT_TIMEOUT, timeout)
+        conn.simple_bind_s(dn, pw)
+        return True
+    except ldap.LDAPError:
+        return False
+    finally:
+        if conn is not None:
+            try:
+                conn.unbind_s()
+            except ldap.LDAPError:
+                pass
 
-try:
-    from ansible_collections.directories.ds.plugins.module_utils import dsldap
-except Exception:  # pragma: no cover
-    import importlib.util
-    import sys
-    import pathlib
-    _p = pathlib.Path(__file__).resolve().parents[3] / 'module_utils' / 'dsldap.py'
-    spec = importlib.util.spec_from_file_location('dsldap', str(_p))
-    dsldap = importlib.util.module_from_spec(spec)
-    sys.modules[spec.name] = dsldap
-    spec.loader.exec_module(dsldap)
 
 def _ldapwhoami_try(url: str, dn: str, pw: str, timeout: int) -> bool:
     try:
@@ -67,29 +100,23 @@ def _ldapwhoami_try(url: str, dn: str, pw: str, timeout: int) -> bool:
 
 
 def _candidate_ldapi_urls(instance: str):
-    return [
+    urls = [
         dsldap.build_ldapi_url(instance, base_dir='/run'),
         dsldap.build_ldapi_url(instance, base_dir='/data/run'),
     ]
+    # Only spawn binds against sockets that exist; keep both when neither is visible (e.g. remote mounts)
+    present = [u for u in urls if os.path.exists(unquote(u[len('ldapi://'):]))]
+    return present or urls
 
 
-def run_module():
-    args = dict(
-        instance=dict(type='str', required=True),
-        name=dict(type='str', default='replication manager'),
-        ensure=dict(type='str', choices=['present', 'absent'], default='present'),
-        password=dict(type='str', no_log=True),
-        verify=dict(type='bool', default=True),
-        op_timeout=dict(type='int', default=30),
-    )
-
-    module = AnsibleModule(argument_spec=args, supports_check_mode=True)
-    p = module.params
-    dn = f"cn={p['name']},cn=config"
+def _ensure_manager(check_mode: bool, instance: str, dn: str, p) -> bool:
+    """Converge the manager entry on one instance; return whether it changed (or would)."""
+    # Unbind as soon as this instance is done so a multi-instance run holds one connection at a time
+    with dsldap.DsLdap(dsldap.LdapConnParams(instance=instance, use_ldapi=True)) as client:
+        return _ensure_manager_on(client, check_mode, instance, dn, p)
 
-    conn = dsldap.LdapConnParams(instance=p['instance'], use_ldapi=True)
-    client = dsldap.DsLdap(conn)
 
+def _ensure_manager_on(client, check_mode: bool, instance: str, dn: str, p) -> bool:
     # Existence check
     exists = False
     try:
@@ -99,42 +126,77 @@ def run_module():
         exists = False
 
     if p['ensure'] == 'absent':
-        if exists:
-            if not module.check_mode:
-                client.delete(dn)
-            module.exit_json(changed=True, dn=dn)
-        module.exit_json(changed=False, dn=dn)
+        if exists and not check_mode:
+            client.delete(dn)
+        return exists
 
     # ensure present
-    changed = False
     if not exists:
-        if module.check_mode:
-            module.exit_json(changed=True, dn=dn)
-        add_attrs = {
-            'objectClass': ['top', 'nsSimpleSecurityObject'],
-            'cn': p['name'],
-        }
-        if p.get('password'):
-            add_attrs['userPassword'] = p['password']
-        client.add(dn, add_attrs)
-        changed = True
-        module.exit_json(changed=changed, dn=dn)
+        if not check_mode:
+            add_attrs = {
+                'objectClass': ['top', 'nsSimpleSecurityObject'],
+                'cn': p['name'],
+            }
+            if p.get('password'):
+                add_attrs['userPassword'] = p['password']
+            client.add(dn, add_attrs)
+        return True
 
     # present: maybe set password
-    if p.get('password'):
-        if p.get('verify', True):
-            ok = False
-            for url in _candidate_ldapi_urls(p['instance']):
-                if _ldapwhoami_try(url, dn, p['password'], p.get('op_timeout', 30)):
-                    ok = True
-                    break
-            if ok:
-                module.exit_json(changed=False, dn=dn)
-        if not module.check_mode:
-            # replace without trying to compare hashed value
-            client.modify(dn, [('replace', 'userPassword', p['password'])])
-        changed = True
-    module.exit_json(changed=changed, dn=dn)
+    if not p.get('password'):
+        return False
+    if p.get('verify', True):
+        # Server-side compare first: one operation on the open connection, no extra bind
+        try:
+            if client.compare(dn, 'userPassword', p['password']):
+                return False
+        except dsldap.DsLdapError:
+            pass
+        for url in _candidate_ldapi_urls(instance):
+            if _bind_ok(url, dn, p['password'], p.get('op_timeout', 30)):
+                return False
+    if not check_mode:
+        # replace without trying to compare hashed value
+        client.modify(dn, [('replace', 'userPassword', p['password'])])
+    return True
+
+
+def run_module():
+    args = dict(
+        instance=dict(type='str'),
+        instances=dict(type='list', elements='str'),
+        name=dict(type='str', default='replication manager'),
+        ensure=dict(type='str', choices=['present', 'absent'], default='present'),
+        password=dict(type='str', no_log=True),
+        verify=dict(type='bool', default=True),
+        op_timeout=dict(type='int', default=30),
+    )
+
+    module = AnsibleModule(
+        argument_spec=args,
+        required_one_of=[['instance', 'instances']],
+        mutually_exclusive=[['instance', 'instances']],
+        supports_check_mode=True,
+    )
+    p = module.params
+    dn = f"cn={p['name']},cn=config"
+
+    if not p.get('instances'):
+        try:
+            changed = _ensure_manager(module.check_mode, p['instance'], dn, p)
+        except dsldap.DsLdapError as e:
+            module.fail_json(msg=str(e), hint=getattr(e, 'hint', None), dn=dn)
+        module.exit_json(changed=changed, dn=dn)
+
+    # Several instances in one module run: one interpreter start, one connection per instance in turn
+    results = []
+    for instance in p['instances']:
+        try:
+            changed = _ensure_manager(module.check_mode, instance, dn, p)
+        except dsldap.DsLdapError as e:
+            module.fail_json(msg=f"{instance}: {e}", hint=getattr(e, 'hint', None), dn=dn, results=results)
+        results.append({'instance': instance, 'changed': changed, 'dn': dn})
+    module.exit_json(changed=any(r['changed'] for r in results), dn=dn, results=results)
 
 
 def main():
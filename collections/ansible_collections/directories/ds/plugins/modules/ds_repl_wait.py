@@ -46,17 +46,38 @@ options:
       configured: {type: int, default: 20}
       start: {type: int, default: 30}
       done: {type: int, default: 120}
-  backoff_after: {type: int, default: 30, description: Seconds after which to increase poll interval}
-  backoff_interval: {type: int, default: 5, description: Poll interval after backoff kicks in}
-  monitor_enabled: {type: bool, default: true, description: Best-effort backlog sampling via dsconf -j replication monitor}
+  backoff_after: {type: int, default: 30, description: Seconds of polling at poll_interval before backoff may start}
+  backoff_interval:
+    type: int
+    default: 5
+    description:
+      - Backoff scale. While nothing is working the interval grows I(backoff_base) times per poll up to
+        I(max_poll_interval), and it shrinks back towards poll_interval as soon as activity is seen.
+        Each sleep adds up to 10% jitter.
+  backoff_base: {type: float, default: 1.5, description: Growth factor per idle poll once backoff has started}
+  max_poll_interval: {type: int, required: false, description: Cap for the backed-off interval; defaults to backoff_interval}
+  monitor_enabled:
+    type: bool
+    default: true
+    description:
+      - Best-effort backlog sampling via dsconf -j replication monitor.
+      - Only sampled when I(require.finished) is true, the one check that uses the backlog.
   monitor_every: {type: int, default: 3, description: Poll cycles between monitor samples}
+  replica_cache_ttl: {type: int, default: 30, description: Seconds to reuse the replica's nsds5ReplicaEnabled before reading it again}
+  fast_exit:
+    type: bool
+    default: true
+    description:
+      - Succeed on the first poll, without waiting for I(steady_ok_polls), when that poll already shows every agreement
+        finished, idle, last update successful and a monitor backlog of 0.
+      - Only applies when I(require.finished) is true, since the backlog is sampled only then.
   use_ldapi: {type: bool, default: true, description: Prefer LDAPI (SASL/EXTERNAL) for local instance}
   ldaps_host: {type: str, description: LDAPS fallback host when LDAPI is unavailable}
   ldaps_port: {type: int, default: 636, description: LDAPS fallback port}
   connect_timeout: {type: int, default: 5, description: LDAP connect timeout seconds}
   op_timeout: {type: int, default: 30, description: LDAP operation timeout seconds}
-  debug: {type: bool, default: false, description: Emit periodic progress warnings}
-  log_every: {type: int, default: 5, description: Emit a progress warning every N cycles when debug=true}
+  debug: {type: bool, default: false, description: Record periodic progress lines, emitted as one warning when the module exits}
+  log_every: {type: int, default: 5, description: Record a progress line every N cycles when debug=true}
 '''
 
 EXAMPLES = r'''
@@ -98,43 +119,44 @@ hints:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
+import collections
+import json
+import random
+import subprocess
 import time
 import re
-from datetime import datetime, timezone
-
-import importlib.util
-import sys
-import pathlib
-
-# Prefer local collection-relative module_utils to ensure we use sources shipped with this module (debug/dev friendly)
-_p = pathlib.Path(__file__).resolve().parents[3] / 'module_utils' / 'dsldap.py'
-if _p.exists():
-    spec = importlib.util.spec_from_file_location('dsldap', str(_p))
-    dsldap = importlib.util.module_from_spec(spec)
-    sys.modules[spec.name] = dsldap
-    spec.loader.exec_module(dsldap)
-else:  # Fallback to standard import path
-    from ansible_collections.directories.ds.plugins.module_utils import dsldap
+
+from ansible_collections.directories.ds.plugins.module_utils import dsldap
 
 _CODE_RE = re.compile(r"(-?\d+)")
 
 
-def _gtz_to_epoch(value):
-    if not isinstance(value, str):
-        return None
-    m = re.match(r"^(\d{4})(\d{2})(\d{2})(\d{2})(\d{2})(\d{2})(?:\.\d+)?Z$", value)
-    if not m:
+def _lead_code(s):
+    """Status code from e.g. '0 Replica acquired successfully' or 'Error (0) ...'; anything else falls back to the first integer."""
+    if not isinstance(s, str):
         return None
     try:
-        y, mo, d, h, mi, s = (int(m.group(i)) for i in range(1, 7))
-        dt = datetime(y, mo, d, h, mi, s, tzinfo=timezone.utc)
-        return int(dt.timestamp())
-    except Exception:
-        return None
+        return int(s.split(None, 1)[0])
+    except (IndexError, ValueError):
+        pass
+    # Current 389-DS layout: 'Error (0) Replica acquired successfully: ...'
+    if s.startswith('Error ('):
+        try:
+            return int(s[7:s.index(')', 7)])
+        except ValueError:
+            pass
+    m = _CODE_RE.search(s)
+    return int(m.group(1)) if m else None
 
 
-def _escape_suffix_value(suffix_dn):
-    return suffix_dn.replace('=', '\\3D').replace(',', '\\2C')
+_TRUTHY = frozenset(('on', 'true', 'yes', '1'))
+
+
+def _truthy(v):
+    """DS boolean attribute value as True/False; None when there is no string value at all."""
+    if not isinstance(v, str):
+        return None
+    return v.strip().lower() in _TRUTHY
 
 
 def _first(vals):
@@ -143,16 +165,6 @@ def _first(vals):
     return None
 
 
-def _aget(attrs, name):
-    if not isinstance(attrs, dict):
-        return None
-    lname = name.lower()
-    for k, v in attrs.items():
-        if isinstance(k, str) and k.lower() == lname:
-            return v
-    return None
-
-
 def _cn_from_dn(dn: str) -> str:
     try:
         rdn = dn.split(',', 1)[0]
@@ -164,61 +176,122 @@ def _cn_from_dn(dn: str) -> str:
     return dn
 
 
-def _observations(client, replica_dn, agmt_dns):
-    now = int(time.time())
-    obs = []
+# Agreement attributes _observation reads; the init status is only fetched when require_init_success uses it
+_OBS_ATTRS = (
+    'nsds5ReplicaEnabled',
+    'nsds5replicaLastUpdateStatus', 'nsds5replicaLastUpdateStart', 'nsds5replicaLastUpdateEnd',
+    'nsds5ReplicaUpdateInProgress',
+)
+_OBS_INIT_ATTRS = _OBS_ATTRS + ('nsds5replicaLastInitStatus',)
+_AGMT_FILTER = '(objectClass=nsDS5ReplicationAgreement)'
+# Same page size as ds_repl_info; large topologies come back in bounded chunks over the one search
+_PAGE_SIZE = 100
+_NS = 1_000_000_000
+# Healthy streaks broken more often than this within _FLAP_WINDOW_NS count as flapping and stretch the poll interval
+_FLAP_LIMIT = 2
+_FLAP_WINDOW_NS = 300 * _NS
+
+
+def _agmt_filter(agmt_dns):
+    """Filter matching only the named agreements, so the server skips the ones nobody waits on.
+
+    Falls back to every agreement when there is no explicit list or a cn carries DN escapes;
+    _observations reads any DN the filter misses on its own.
+    """
+    if not agmt_dns:
+        return _AGMT_FILTER
+    cns = []
+    for dn in agmt_dns:
+        cn = _cn_from_dn(dn)
+        if cn == dn or '\\' in cn:
+            return _AGMT_FILTER
+        cns.append(f"(cn={dsldap.ldap_filter_escape(cn.strip())})")
+    return f"(&{_AGMT_FILTER}(|{''.join(cns)}))"
+
+
+def _missing(dn, r_enabled):
+    return dict(dn=dn, enabled=None, busy=None, update_start_epoch=None, update_code=None, update_age=None, init_code=None, replica_enabled=r_enabled, status='missing')
+
+
+def _observation(dn, a, now, r_enabled):
+    la = dsldap.lc_index(a)
+    vals_en = la.get('nsds5replicaenabled')
+    agmt_enabled = None
+    if vals_en is not None:
+        agmt_enabled = _truthy(_first(vals_en) or '')
+    init_status = _first(la.get('nsds5replicalastinitstatus'))
+    upd_status = _first(la.get('nsds5replicalastupdatestatus'))
+    init_code = _lead_code(init_status)
+    upd_code = _lead_code(upd_status)
+    upd_start = _first(la.get('nsds5replicalastupdatestart'))
+    upd_end = _first(la.get('nsds5replicalastupdateend'))
+    busy_raw = _first(la.get('nsds5replicaupdateinprogress'))
+    busy = _truthy(busy_raw)
+    # Timestamps repeat across polls until the next update session, so conversions are cached; a session that
+    # already ended in the same second shares one conversion for start and end
+    upd_epoch = dsldap.generalized_time_to_epoch(upd_end) if upd_end else None
+    if upd_start and upd_start == upd_end:
+        upd_start_epoch = upd_epoch
+    else:
+        upd_start_epoch = dsldap.generalized_time_to_epoch(upd_start) if upd_start else None
+    upd_age = (now - upd_epoch) if upd_epoch is not None else None
+    status = 'unknown'
+    return dict(
+        dn=dn,
+        enabled=agmt_enabled,
+        busy=busy,
+        update_start_epoch=upd_start_epoch,
+        update_code=upd_code,
+        update_age=upd_age if upd_age is not None else -1,
+        init_code=init_code,
+        update_status=upd_status,
+        init_status=init_status,
+        replica_enabled=r_enabled,
+        status=status,
+    )
+
+
+def _replica_enabled(client, replica_dn):
     try:
         rep = client.search_one(replica_dn, 'base', '(objectClass=*)', ['nsds5ReplicaEnabled'])
-        vals = rep.get('attrs', {}).get('nsds5ReplicaEnabled')
+        vals = dsldap.lc_index(rep.get('attrs')).get('nsds5replicaenabled')
         if vals:
-            r_enabled = (vals[0] or '').lower() in ('on', 'true', 'yes', '1')
+            return _truthy(vals[0] or '')
+    except (dsldap.DsLdapError, OSError):
+        pass
+    return None
+
+
+def _observations(client, replica_dn, agmt_dns, now, r_enabled, attrs=_OBS_INIT_ATTRS, flt=_AGMT_FILTER):
+    """Observe agreements at epoch `now`; agmt_dns=None observes every agreement under the replica."""
+    # One one-level search returns the agreements in scope; index it by lowercased DN
+    try:
+        ents = client.search(replica_dn, 'one', flt, attrs, page_size=_PAGE_SIZE)
+        by_dn = {e['dn'].lower(): (e['dn'], e.get('attrs', {})) for e in ents if e.get('dn')}
+    except (dsldap.DsLdapError, OSError):
+        by_dn = None
+    if agmt_dns is None:
+        if by_dn is None:
+            return []
+        return [_observation(dn, a, now, r_enabled) for dn, a in by_dn.values()]
+    obs = [None] * len(agmt_dns)
+    missing = []
+    for i, dn in enumerate(agmt_dns):
+        hit = by_dn.get(dn.lower()) if by_dn is not None else None
+        if hit is not None:
+            obs[i] = _observation(dn, hit[1], now, r_enabled)
         else:
-            r_enabled = None
-    except Exception:
-        r_enabled = None
-    for dn in agmt_dns:
+            missing.append(i)
+    # Explicit DNs the batch did not return (other spelling, or gone) are read by DN; search_each overlaps
+    # those round trips (pipelined on the python-ldap connection, side by side on the CLI path)
+    if missing:
         try:
-            e = client.search_one(dn, 'base', '(objectClass=*)', [
-                'nsds5ReplicaEnabled',
-                'nsds5replicaLastInitStatus', 'nsds5replicaLastInitEnd', 'nsds5replicaLastInitStatusJSON',
-                'nsds5replicaLastUpdateStatus', 'nsds5replicaLastUpdateStart', 'nsds5replicaLastUpdateEnd', 'nsds5replicaLastUpdateStatusJSON',
-                'nsds5ReplicaUpdateInProgress',
-            ])
-            a = e.get('attrs', {})
-            vals_en = _aget(a, 'nsds5ReplicaEnabled')
-            agmt_enabled = None
-            if vals_en is not None:
-                agmt_enabled = (_first(vals_en) or '').lower() in ('on','true','yes','1')
-            init_status = _first(_aget(a, 'nsds5replicaLastInitStatus'))
-            upd_status = _first(_aget(a, 'nsds5replicaLastUpdateStatus'))
-            # Parse first integer anywhere in the status strings if present
-            m_i = _CODE_RE.search(init_status) if isinstance(init_status, str) else None
-            m_u = _CODE_RE.search(upd_status) if isinstance(upd_status, str) else None
-            init_code = int(m_i.group(1)) if m_i else None
-            upd_code = int(m_u.group(1)) if m_u else None
-            upd_start = _first(_aget(a, 'nsds5replicaLastUpdateStart'))
-            upd_end = _first(_aget(a, 'nsds5replicaLastUpdateEnd'))
-            busy_raw = _first(_aget(a, 'nsds5ReplicaUpdateInProgress'))
-            busy = (busy_raw or '').strip().lower() in ('true','yes','on','1') if isinstance(busy_raw, str) else None
-            upd_epoch = _gtz_to_epoch(upd_end) if upd_end else None
-            upd_start_epoch = _gtz_to_epoch(upd_start) if upd_start else None
-            upd_age = (now - upd_epoch) if upd_epoch is not None else None
-            status = 'unknown'
-            obs.append(dict(
-                dn=dn,
-                enabled=agmt_enabled,
-                busy=busy,
-                update_start_epoch=upd_start_epoch,
-                update_code=upd_code,
-                update_age=upd_age if upd_age is not None else -1,
-                init_code=init_code,
-                update_status=upd_status,
-                init_status=init_status,
-                replica_enabled=r_enabled,
-                status=status,
-            ))
-        except Exception:
-            obs.append(dict(dn=dn, enabled=None, busy=None, update_start_epoch=None, update_code=None, update_age=None, init_code=None, replica_enabled=r_enabled, status='missing'))
+            ents = client.search_each([agmt_dns[i] for i in missing], '(objectClass=*)', attrs)
+        except (dsldap.DsLdapError, OSError):
+            ents = [None] * len(missing)
+        for i, e in zip(missing, ents):
+            dn = agmt_dns[i]
+            obs[i] = _observation(dn, e.get('attrs', {}), now, r_enabled) if e is not None else _missing(dn, r_enabled)
     return obs
 
 
@@ -237,8 +310,12 @@ def run_module():
         timeouts=dict(type='dict', options=dict(configured=dict(type='int', default=20), start=dict(type='int', default=30), done=dict(type='int', default=120))),
         backoff_after=dict(type='int', default=30),
         backoff_interval=dict(type='int', default=5),
+        backoff_base=dict(type='float', default=1.5),
+        max_poll_interval=dict(type='int', required=False),
         monitor_enabled=dict(type='bool', default=True),
         monitor_every=dict(type='int', default=3),
+        replica_cache_ttl=dict(type='int', default=30),
+        fast_exit=dict(type='bool', default=True),
         use_ldapi=dict(type='bool', default=True),
         ldaps_host=dict(type='str'),
         ldaps_port=dict(type='int', default=636),
@@ -261,26 +338,13 @@ def run_module():
     )
     client = dsldap.DsLdap(conn)
 
-    esc_suffix = _escape_suffix_value(p['suffix'])
-    replica_dn = f"cn=replica,cn={esc_suffix},cn=mapping tree,cn=config"
+    replica_dn = dsldap.replica_dn(p['suffix'])
 
-    target_dns = []
+    # None: observe every agreement the per-cycle search returns; no separate discovery search
+    target_dns = None
     if p.get('agreements'):
         target_dns = list(p['agreements'])
-    elif p.get('all'):
-        try:
-            ents = client.search(replica_dn, 'one', '(objectClass=nsDS5ReplicationAgreement)', ['cn'])
-        except Exception:
-            ents = []
-        # Build DNs from cn values to avoid any LDIF wrapping issues on 'dn:'
-        def _first(vals):
-            return vals[0] if isinstance(vals, list) and vals else None
-        target_dns = []
-        for e in ents:
-            cnv = _first(e.get('attrs', {}).get('cn'))
-            if cnv:
-                target_dns.append(f"cn={cnv},{replica_dn}")
-    else:
+    elif not p.get('all'):
         module.fail_json(msg="Specify 'agreements' list or set 'all: true'")
 
     # Visibility: where dsldap came from and what we will watch
@@ -289,90 +353,149 @@ def run_module():
             module.warn(f"ds_repl_wait: using dsldap from {getattr(dsldap, '__file__', 'unknown')}")
         except Exception:
             pass
-        module.warn(f"ds_repl_wait: discovered agreements: {', '.join(target_dns) if target_dns else '(none)'}")
+        if target_dns is not None:
+            module.warn(f"ds_repl_wait: watching agreements: {', '.join(target_dns) if target_dns else '(none)'}")
 
-    start_ts = time.monotonic()
-    deadline = start_ts + int(p['timeout'])
+    # Integer nanoseconds throughout: exact comparisons and whole-second elapsed values without float rounding
+    start_ns = time.monotonic_ns()
+    deadline = start_ns + int(p['timeout']) * _NS
     # Phase deadlines when 'require' set
     req = p.get('require') or {}
     use_phases = bool(req)
     tmo = p.get('timeouts') or {}
-    configured_deadline = start_ts + int((tmo.get('configured') if isinstance(tmo, dict) else 20) or 20)
-    working_deadline = configured_deadline + int((tmo.get('start') if isinstance(tmo, dict) else 30) or 30)
-    done_deadline = working_deadline + int((tmo.get('done') if isinstance(tmo, dict) else 120) or 120)
+    configured_deadline = start_ns + int((tmo.get('configured') if isinstance(tmo, dict) else 20) or 20) * _NS
+    working_deadline = configured_deadline + int((tmo.get('start') if isinstance(tmo, dict) else 30) or 30) * _NS
+    done_deadline = working_deadline + int((tmo.get('done') if isinstance(tmo, dict) else 120) or 120) * _NS
+    # Loop-invariant settings, read and converted once
+    poll_interval = int(p['poll_interval'])
+    backoff_after = int(p.get('backoff_after', 30))
+    backoff_interval = int(p.get('backoff_interval', 5))
+    backoff_base = max(1.0, float(p.get('backoff_base') or 1.5))
+    stale = int(p['stale_seconds'])
+    steady_ok_polls = int(p['steady_ok_polls'])
+    monitor_enabled = bool(p.get('monitor_enabled', True))
+    monitor_every = int(p.get('monitor_every', 3))
+    # The replica's enabled flag rarely changes during a wait; re-read it only once the TTL has passed
+    replica_cache_ttl = int(p.get('replica_cache_ttl', 30)) * _NS
+    r_enabled = None
+    r_enabled_at = None
+    require_init_success = bool(p.get('require_init_success'))
+    obs_attrs = _OBS_INIT_ATTRS if require_init_success else _OBS_ATTRS
+    obs_filter = _agmt_filter(target_dns)
+    debug = bool(p.get('debug'))
+    log_every = int(p.get('log_every', 5))
+    wanted_configured = bool(req.get('configured', True))
+    wanted_working = bool(req.get('working', True))
+    wanted_finished = bool(req.get('finished', False))
+    # Backlog only decides require.finished; skip the dsconf fork when nothing will act on it
+    sample_monitor = monitor_enabled and use_phases and wanted_finished
+    fast_exit = sample_monitor and bool(p.get('fast_exit', True))
+    base_sleep = float(poll_interval)
+    cur_sleep = base_sleep
+    max_sleep = float(max(poll_interval, p.get('max_poll_interval') or backoff_interval))
     ok_streak = 0
+    # Times of recent streak breaks; only the newest few matter for the stretch below
+    flap_times = collections.deque(maxlen=_FLAP_LIMIT + 8)
+    stretched = False
     cycle = 0
     last_obs = []
-    hints = []
-    progress = []
+    # A set: the same DN/reason recurs on every unhealthy cycle; hinted holds the (dn, reason) pairs already
+    # turned into text so a repeat costs a tuple lookup rather than another formatted string
+    hints = set()
+    hinted = set()
+    # Latest 50 snapshots; the cycles just before a timeout are the diagnostic ones
+    progress = collections.deque(maxlen=50)
+    # Progress lines for the final warning; one module.warn at exit instead of one per logged cycle
+    log_lines = collections.deque(maxlen=20)
     prev_by_dn = {}
+    # Agreement DN -> cn; explicit DNs are split up front, discovered ones the first time they are seen
+    dn_names = {dn: _cn_from_dn(dn) for dn in target_dns or ()}
     backlog_by_name = {}
 
-    def _monitor_sample():
+    # LDAPI URLs for dsconf, starting with the endpoint the LDAP client already reached; the URL that
+    # answers a sample moves to the front so later samples do not retry a dead socket first
+    mon_urls = []
+
+    def _finish():
+        # Runs before every exit: emit the collected progress lines and unbind the one connection the loop reused
+        if log_lines:
+            module.warn('\n'.join(log_lines))
+            log_lines.clear()
+        client.close()
+
+    def _monitor_sample(wanted):
         nonlocal backlog_by_name
-        if not p.get('monitor_enabled', True):
+        if not sample_monitor:
             return
-        # Build ldapi URLs
-        urls = [
-            dsldap.build_ldapi_url(p['instance'], "/run"),
-            dsldap.build_ldapi_url(p['instance'], "/data/run"),
-        ]
-        import subprocess
-        import json as _json
-        for url in urls:
+        if not mon_urls:
+            mon_urls.extend([
+                dsldap.build_ldapi_url(p['instance'], "/run"),
+                dsldap.build_ldapi_url(p['instance'], "/data/run"),
+            ])
+            resolved = client.resolved_url
+            if resolved in mon_urls[1:]:
+                mon_urls.remove(resolved)
+                mon_urls.insert(0, resolved)
+        for url in list(mon_urls):
             try:
-                cp = subprocess.run(["dsconf", "-j", url, "replication", "monitor", "--suffix", p['suffix']], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=10)
+                # Raw bytes straight into json.loads (it detects the UTF encoding); stderr is never read
+                cp = subprocess.run(["dsconf", "-j", url, "replication", "monitor", "--suffix", p['suffix']], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10)
                 if cp.returncode == 0 and cp.stdout:
-                    mon = _json.loads(cp.stdout)
-                    out = {}
-                    def _walk(x):
-                        if isinstance(x, dict):
-                            nm = x.get('name') if isinstance(x.get('name'), str) else None
-                            bl = None
-                            for kk, vv in x.items():
-                                if isinstance(kk, str) and 'backlog' in kk.lower():
-                                    try:
-                                        bl = int(vv)
-                                    except Exception:
-                                        pass
-                            if nm and isinstance(bl, int):
-                                out[nm] = bl
-                            for vv in x.values():
-                                _walk(vv)
-                        elif isinstance(x, list):
-                            for it in x:
-                                _walk(it)
-                    _walk(mon)
+                    mon = json.loads(cp.stdout)
+                    out = dsldap.extract_backlogs(mon, wanted)
                     backlog_by_name = out
+                    if url != mon_urls[0]:
+                        mon_urls.remove(url)
+                        mon_urls.insert(0, url)
                     return
-            except Exception:
+            # Unreachable endpoint, missing dsconf or a non-JSON reply: try the next URL; anything else is a bug
+            except (OSError, subprocess.SubprocessError, ValueError):
                 continue
 
-    while time.monotonic() < deadline:
+    while True:
+        # One monotonic and one wall-clock read per cycle, shared by everything below
+        mono = time.monotonic_ns()
+        if mono >= deadline:
+            break
+        now_epoch = int(time.time())
+        elapsed = (mono - start_ns) // _NS
         cycle += 1
-        last_obs = _observations(client, replica_dn, target_dns)
+        if r_enabled_at is None or mono - r_enabled_at >= replica_cache_ttl:
+            r_enabled = _replica_enabled(client, replica_dn)
+            r_enabled_at = mono
+        last_obs = _observations(client, replica_dn, target_dns, now_epoch, r_enabled, obs_attrs, obs_filter)
+        if cycle == 1 and target_dns is None and debug:
+            found = ', '.join(o['dn'] for o in last_obs) if last_obs else '(none)'
+            module.warn(f"ds_repl_wait: discovered agreements: {found}")
         # Monitor backlog sampling periodically
-        if p.get('monitor_enabled', True) and (cycle == 1 or (int(p.get('monitor_every', 3)) > 0 and (cycle % int(p['monitor_every']) == 0))):
-            _monitor_sample()
+        if sample_monitor and (cycle == 1 or (monitor_every > 0 and cycle % monitor_every == 0)):
+            # Names of the watched agreements, cached per DN like the aggregate pass below
+            _monitor_sample({dn_names.get(o['dn']) or dn_names.setdefault(o['dn'], _cn_from_dn(o['dn'])) for o in last_obs})
         unhealthy = []
 
         # Aggregates
-        now_epoch = int(time.time())
-        stale = int(p['stale_seconds'])
         configured_met = True if last_obs else False
         working_met = False
         finished_met = True if last_obs else False
+        # Already converged on the first look (idle, update ok, backlog 0 everywhere): no streak needed to confirm it
+        quiescent = fast_exit and cycle == 1 and bool(last_obs)
 
+        # Rebuilt every cycle so DNs that disappear (e.g. reconfigured under all: true) are dropped
+        cur_by_dn = {}
         for o in last_obs:
+            # Every observation carries these keys; pull them out once instead of repeated dict lookups
             dn = o['dn']
+            start_e = o['update_start_epoch']
+            age = o['update_age']
+            uc = o['update_code']
+            init_code = o['init_code']
+            busy_v = o['busy']
             # Configured: agreement exists and is enabled
-            if o.get('enabled') is not True:
+            if o['enabled'] is not True:
                 configured_met = False
             # Trend detection
             prev = prev_by_dn.get(dn)
-            start_e = o.get('update_start_epoch')
             end_e = None
-            age = o.get('update_age')
             # Convert age to end epoch if known
             if age is not None and age >= 0:
                 end_e = now_epoch - age
@@ -385,72 +508,78 @@ def run_module():
                 if age is not None and prev.get('age') is not None and age < prev['age']:
                     moving = True
             # Success signals
-            uc = o.get('update_code')
             recent_ok = (uc == 0) and (age is not None and age >= 0 and age <= stale)
-            busy = (o.get('busy') is True)
+            busy = (busy_v is True)
 
             if busy or moving or recent_ok:
                 working_met = True
 
             # Finished per-agreement: not busy, init ok (if required), and recent_ok
-            init_ok = (o.get('init_code') in (None, 0)) or (not p.get('require_init_success'))
+            init_ok = (init_code in (None, 0)) or (not require_init_success)
             # If backlog available for this agreement name, require backlog==0
-            name = _cn_from_dn(dn)
+            name = dn_names.get(dn)
+            if name is None:
+                name = dn_names[dn] = _cn_from_dn(dn)
             blv = backlog_by_name.get(name)
-            bl_ok = True if (blv is None) else (int(blv) == 0)
+            # extract_backlogs already stores ints
+            bl_ok = blv is None or blv == 0
             agmt_finished = ((busy is False or busy is None) and init_ok and recent_ok and bl_ok)
+            if busy or uc != 0 or blv != 0:
+                quiescent = False
             if not agmt_finished:
                 finished_met = False
 
-            # Build unhealthy only for strong signals (for compatibility)
-            if o.get('replica_enabled') is False:
+            # Build unhealthy only for strong signals (for compatibility); one reason per DN, most fundamental first
+            if o['replica_enabled'] is False:
                 unhealthy.append((dn, 'replica disabled'))
-            if p.get('require_init_success') and o.get('init_code') not in (None, 0):
+            elif require_init_success and init_code not in (None, 0):
                 unhealthy.append((dn, 'init_code!=0'))
-            if uc not in (None, 0) and (age is None or age < 0 or age > stale):
+            elif uc not in (None, 0) and (age is None or age < 0 or age > stale):
                 unhealthy.append((dn, 'update_code!=0'))
 
             # Track previous
-            prev_by_dn[dn] = dict(update_start_epoch=start_e, end_epoch=end_e, age=age)
+            cur_by_dn[dn] = dict(update_start_epoch=start_e, end_epoch=end_e, age=age)
+        prev_by_dn = cur_by_dn
 
         # progress snapshot
-        elapsed = int(time.monotonic() - start_ts)
-        if p.get('debug') and p.get('log_every', 5) > 0 and (cycle % int(p['log_every']) == 0 or cycle == 1):
-            sample = ', '.join([f"{o['dn'].split(',')[0]}:{o.get('status')} age={o.get('update_age')} code={o.get('update_code')}" for o in last_obs][:3])
-            module.warn(f"ds_repl_wait: cycle={cycle} elapsed={elapsed}s unhealthy={len(unhealthy)} ok_streak={ok_streak} sample=[{sample}]")
-        elif not p.get('debug') and cycle % 10 == 0:  # Less frequent logging when not in debug mode
-            module.warn(f"ds_repl_wait: cycle={cycle} elapsed={elapsed}s unhealthy={len(unhealthy)} ok_streak={ok_streak}")
-        if len(progress) < 50:
-            progress.append(dict(cycle=cycle, elapsed_s=elapsed, unhealthy=len(unhealthy)))
+        if debug and log_every > 0 and (cycle % log_every == 0 or cycle == 1):
+            # Names come from the dn_names cache the aggregate pass just filled; no per-cycle DN splitting
+            sample = ', '.join(f"{dn_names[o['dn']]}:{o['status']} age={o['update_age']} code={o['update_code']}" for o in last_obs[:3])
+            log_lines.append(f"ds_repl_wait: cycle={cycle} elapsed={elapsed}s unhealthy={len(unhealthy)} ok_streak={ok_streak} sample=[{sample}]")
+        elif not debug and cycle % 10 == 0:  # Less frequent logging when not in debug mode
+            log_lines.append(f"ds_repl_wait: cycle={cycle} elapsed={elapsed}s unhealthy={len(unhealthy)} ok_streak={ok_streak}")
+        progress.append(dict(cycle=cycle, elapsed_s=elapsed, unhealthy=len(unhealthy)))
 
         # Determine success condition
         if use_phases:
-            wanted_configured = bool(req.get('configured', True))
-            wanted_working = bool(req.get('working', True))
-            wanted_finished = bool(req.get('finished', False))
             # Check timeouts per phase
-            now_mono = time.monotonic()
-            if wanted_configured and now_mono > configured_deadline and not configured_met:
-                elapsed_final = int(now_mono - start_ts)
-                module.fail_json(msg="Replication not configured in time", reason="configured-timeout", observations=last_obs, hints=sorted(set(hints + ["Agreement disabled or missing"])), cycles=cycle, elapsed_s=elapsed_final, agreements=len(target_dns), progress=progress, summary=dict(configured=configured_met, working=working_met, finished=finished_met))
-            if wanted_working and now_mono > working_deadline and not working_met:
-                elapsed_final = int(now_mono - start_ts)
-                module.fail_json(msg="Replication did not start within timeout", reason="start-timeout", observations=last_obs, hints=sorted(set(hints + ["No activity observed"])), cycles=cycle, elapsed_s=elapsed_final, agreements=len(target_dns), progress=progress, summary=dict(configured=configured_met, working=working_met, finished=finished_met))
-            if wanted_finished and now_mono > done_deadline and not finished_met:
-                elapsed_final = int(now_mono - start_ts)
+            if wanted_configured and mono >= configured_deadline and not configured_met:
+                elapsed_final = elapsed
+                _finish()
+                module.fail_json(msg="Replication not configured in time", reason="configured-timeout", observations=last_obs, hints=sorted(hints | {"Agreement disabled or missing"}), cycles=cycle, elapsed_s=elapsed_final, agreements=len(last_obs), progress=list(progress), summary=dict(configured=configured_met, working=working_met, finished=finished_met))
+            if wanted_working and mono >= working_deadline and not working_met:
+                elapsed_final = elapsed
+                _finish()
+                module.fail_json(msg="Replication did not start within timeout", reason="start-timeout", observations=last_obs, hints=sorted(hints | {"No activity observed"}), cycles=cycle, elapsed_s=elapsed_final, agreements=len(last_obs), progress=list(progress), summary=dict(configured=configured_met, working=working_met, finished=finished_met))
+            if wanted_finished and mono >= done_deadline and not finished_met:
+                elapsed_final = elapsed
                 # Attach backlog hints if present
                 if backlog_by_name:
                     for nm, bl in backlog_by_name.items():
-                        hints.append(f"{nm}: backlog={bl}")
-                module.fail_json(msg="Replication did not finish within timeout", reason="done-timeout", observations=last_obs, hints=sorted(set(hints + ["Not converged"])), cycles=cycle, elapsed_s=elapsed_final, agreements=len(target_dns), progress=progress, summary=dict(configured=configured_met, working=working_met, finished=finished_met))
+                        hints.add(f"{nm}: backlog={bl}")
+                _finish()
+                module.fail_json(msg="Replication did not finish within timeout", reason="done-timeout", observations=last_obs, hints=sorted(hints | {"Not converged"}), cycles=cycle, elapsed_s=elapsed_final, agreements=len(last_obs), progress=list(progress), summary=dict(configured=configured_met, working=working_met, finished=finished_met))
             # Success
             if ((not wanted_configured) or configured_met) and ((not wanted_working) or working_met) and ((not wanted_finished) or finished_met):
                 ok_streak += 1
                 for o in last_obs:
                     o['status'] = 'healthy'
-                if ok_streak >= int(p['steady_ok_polls']):
-                    module.exit_json(changed=False, observations=last_obs, cycles=cycle, elapsed_s=elapsed, agreements=len(target_dns), progress=progress, summary=dict(configured=configured_met, working=working_met, finished=finished_met))
+                if ok_streak >= steady_ok_polls or quiescent:
+                    _finish()
+                    module.exit_json(changed=False, observations=last_obs, cycles=cycle, elapsed_s=elapsed, agreements=len(last_obs), progress=list(progress), summary=dict(configured=configured_met, working=working_met, finished=finished_met))
             else:
+                if ok_streak:
+                    flap_times.append(mono)
                 ok_streak = 0
         else:
             # Backward-compatible heuristic: all agreements not stale and no failures
@@ -458,27 +587,63 @@ def run_module():
                 ok_streak += 1
                 for o in last_obs:
                     o['status'] = 'healthy'
-                if ok_streak >= int(p['steady_ok_polls']):
-                    module.exit_json(changed=False, observations=last_obs, cycles=cycle, elapsed_s=elapsed, agreements=len(target_dns), progress=progress)
+                if ok_streak >= steady_ok_polls:
+                    _finish()
+                    module.exit_json(changed=False, observations=last_obs, cycles=cycle, elapsed_s=elapsed, agreements=len(last_obs), progress=list(progress))
             else:
+                if ok_streak:
+                    flap_times.append(mono)
                 ok_streak = 0
                 for dn, reason in unhealthy:
+                    if (dn, reason) in hinted:
+                        continue
+                    hinted.add((dn, reason))
                     if reason == 'stale':
-                        hints.append(f"{dn}: Last update stale >{p['stale_seconds']}s")
+                        hints.add(f"{dn}: Last update stale >{stale}s")
                     elif reason == 'update_code!=0':
-                        hints.append(f"{dn}: Replication update failed (code != 0)")
+                        hints.add(f"{dn}: Replication update failed (code != 0)")
                     elif reason == 'init_code!=0':
-                        hints.append(f"{dn}: Last init failed (code != 0)")
+                        hints.add(f"{dn}: Last init failed (code != 0)")
                     elif reason == 'replica disabled':
-                        hints.append(f"{dn}: Replica disabled")
+                        hints.add(f"{dn}: Replica disabled")
 
         # Backoff-aware sleep
-        pi = int(p['poll_interval'])
-        sleep_for = pi if elapsed < int(p.get('backoff_after', 30)) else max(pi, int(p.get('backoff_interval', 5)))
-        time.sleep(sleep_for)
-
-    elapsed_final = int(time.monotonic() - start_ts)
-    module.fail_json(msg="Agreements not healthy within timeout", reason="timeout", observations=last_obs, hints=sorted(set(hints)), cycles=cycle, elapsed_s=elapsed_final, agreements=len(target_dns), progress=progress)
+        # Adaptive backoff: hold poll_interval early on and whenever something is working (busy, moving or
+        # recently updated); back off geometrically while idle; jitter keeps parallel hosts from polling in step
+        if elapsed < backoff_after or working_met:
+            cur_sleep = max(base_sleep, cur_sleep / backoff_base)
+        else:
+            cur_sleep = min(max_sleep, cur_sleep * backoff_base)
+        sleep_for = cur_sleep + random.uniform(0, cur_sleep * 0.1)
+        # A flapping agreement keeps breaking the streak right after it starts; polling it at full rate only
+        # restarts the count, so give it geometrically longer to settle (still within max_sleep). Breaks older
+        # than the window no longer count, so an agreement that flapped once early on polls normally again
+        while flap_times and flap_times[0] < mono - _FLAP_WINDOW_NS:
+            flap_times.popleft()
+        flaps = len(flap_times)
+        # Record when the stretch starts and stops, so a slow wait shows it was flapping rather than just idle
+        if (flaps > _FLAP_LIMIT) != stretched:
+            stretched = not stretched
+            state = 'flapping, poll interval stretched' if stretched else 'settled, normal poll interval'
+            log_lines.append(f"ds_repl_wait: cycle={cycle} elapsed={elapsed}s {state} (streak breaks in {_FLAP_WINDOW_NS // _NS}s: {flaps})")
+        if stretched:
+            sleep_for = max(sleep_for, min(max_sleep, sleep_for * backoff_base ** min(flaps - _FLAP_LIMIT, 8)))
+        # Wake no later than the next deadline that can end the run, so a phase timeout or the overall
+        # timeout is acted on when it falls due rather than up to a full interval later
+        wake_by = deadline
+        if use_phases:
+            if wanted_configured and not configured_met:
+                wake_by = min(wake_by, configured_deadline)
+            if wanted_working and not working_met:
+                wake_by = min(wake_by, working_deadline)
+            if wanted_finished and not finished_met:
+                wake_by = min(wake_by, done_deadline)
+        # Fresh read here: the observations above may have taken a noticeable part of the interval
+        time.sleep(max(0.0, min(sleep_for, (wake_by - time.monotonic_ns()) / _NS)))
+
+    elapsed_final = (mono - start_ns) // _NS
+    _finish()
+    module.fail_json(msg="Agreements not healthy within timeout", reason="timeout", observations=last_obs, hints=sorted(hints), cycles=cycle, elapsed_s=elapsed_final, agreements=len(last_obs), progress=list(progress))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""
+Controller-side cache of the LDAP endpoint each instance answered on.
+
+Action plugins built on DsLdapCacheAction pass the endpoint a previous directories.ds task
+resolved for the same instance to the module as C(_resolved_url), so the module tries it first
+instead of walking the LDAPI/LDAPS candidates again. The cache lives in a per-host fact.
+"""
+
+from __future__ import annotations
+
+from ansible.plugins.action import ActionBase
+
+
+FACT_NAME = "ds_ldap_resolved_urls"
+
+
+class DsLdapCacheAction(ActionBase):
+    """Run the module with the cached endpoint hint and record the endpoint it reports back."""
+
+    def run(self, tmp=None, task_vars=None):
+        task_vars = task_vars or {}
+        result = super().run(tmp, task_vars)
+
+        facts = task_vars.get("ansible_facts") or {}
+        cache = dict(facts.get(FACT_NAME) or task_vars.get(FACT_NAME) or {})
+        module_args = dict(self._task.args)
+        instance = module_args.get("instance")
+        if instance and cache.get(instance) and not module_args.get("_resolved_url"):
+            module_args["_resolved_url"] = cache[instance]
+
+        result.update(self._execute_module(module_name=self._task.action, module_args=module_args, task_vars=task_vars))
+
+        url = result.get("ldap_url")
+        if instance and url and cache.get(instance) != url:
+            cache[instance] = url
+            result.setdefault("ansible_facts", {})[FACT_NAME] = cache
+        return result
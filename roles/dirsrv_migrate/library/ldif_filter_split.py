@@ -8,31 +8,37 @@ import re
 import io
 import base64
 import gzip
-import shutil
+import itertools
 
 
 def unfold(lines):
-    out, buf = [], ""
+    # Collect continuation pieces and join once; += on a long folded value (base64 blobs) can go quadratic
+    out, buf = [], []
     for line in lines:
+        line = line.rstrip("\r\n")
         if line.startswith(" "):
-            buf += line[1:]
+            buf.append(line[1:])
         else:
             if buf:
-                out.append(buf)
-            buf = line
+                out.append("".join(buf))
+            buf = [line]
     if buf:
-        out.append(buf)
+        out.append("".join(buf))
     return out
 
 
-def parse_entry(txt):
-    u = unfold(txt.splitlines())
-    dn, ocs, attrs = "", set(), {}
+def parse_entry(lines):
+    # Raw lines as read from the file; unfold strips their line endings
+    u = unfold(lines)
+    dn, ocs = "", set()
     for ln in u:
         if ":" not in ln:
             continue
         name, rest = ln.split(":", 1)
-        name = name.strip()
+        low = name.strip().lower()
+        # The filter rules only look at the DN and objectClass; other values (often large binaries) are never decoded
+        if low != "dn" and low != "objectclass":
+            continue
         is_b64 = rest.startswith(":")
         raw = rest[1:].strip() if is_b64 else rest.strip()
         if is_b64:
@@ -42,36 +48,68 @@ def parse_entry(txt):
                 val = ""
         else:
             val = raw
-        low = name.lower()
         if low == "dn":
             dn = val
-        else:
-            attrs.setdefault(name, []).append(val)
-            if low == "objectclass" and val:
-                ocs.add(val.strip().lower())
-    return dn, ocs, attrs
+        elif val:
+            ocs.add(val.strip().lower())
+    return dn, ocs
+
+
+class _TeeReader(io.RawIOBase):
+    """Raw byte reader that copies everything it reads into `sink` (the compressed original)."""
+
+    def __init__(self, raw, sink):
+        self._raw = raw
+        self._sink = sink
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self._raw.readinto(b)
+        if n:
+            self._sink.write(b[:n])
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._raw.close()
+            self._sink.close()
+        super().close()
+
+
+# Output buffer size; entries are small writes, so a large buffer keeps write syscalls (and gzip flushes) rare
+WRITE_BUFFER = 1 << 20
 
 
-def write_entry(fh, blob):
-    # ensure exactly one blank line between entries
-    if blob.endswith("\n"):
-        fh.write(blob)
-        if not blob.endswith("\n\n"):
-            fh.write("\n")
-    else:
-        fh.write(blob + "\n\n")
+def open_source(src, gz_copy=None):
+    """Text stream over src; .gz sources are decompressed, and gz_copy receives a compressed copy while reading."""
+    if src.endswith(".gz"):
+        return gzip.open(src, "rt", encoding="utf-8", errors="replace")
+    if gz_copy:
+        tee = _TeeReader(io.open(src, "rb"), gzip.open(gz_copy, "wb"))
+        return io.TextIOWrapper(io.BufferedReader(tee), encoding="utf-8", errors="replace")
+    return io.open(src, "r", encoding="utf-8", errors="replace")
+
+
+def write_entry(fh, lines):
+    # ensure exactly one blank line between entries; only the last line can lack its newline (end of file)
+    fh.writelines(lines)
+    fh.write("\n" if lines[-1].endswith("\n") else "\n\n")
 
 
 def compile_rules(dn_regex_any, oc_all_groups):
+    # Compiled one by one: joined into a single alternation, inline flags, group names and backreferences
+    # in the user's patterns would change meaning or fail to compile
     dn_res = [re.compile(p, re.IGNORECASE) for p in dn_regex_any]
-    oc_all = [set(x.strip().lower() for x in grp if x) for grp in oc_all_groups]
+    oc_all = [frozenset(x.strip().lower() for x in grp if x) for grp in oc_all_groups]
     return dn_res, oc_all
 
 
 def should_drop(dn, ocs, dn_res, oc_all):
     if any(rx.search(dn) for rx in dn_res):
         return True
-    if any(all(x in ocs for x in grp) for grp in oc_all):
+    if any(grp.issubset(ocs) for grp in oc_all):
         return True
     return False
 
@@ -105,70 +143,68 @@ def run_module():
     kept = removed = 0
     wrote_preamble = False
 
+    # The original is compressed in the same pass that filters it, instead of being read a second time
+    orig_gz = None
+    gz_copy = None
+    if p["compress_orig"] and not module.check_mode:
+        orig_gz = src if src.endswith(".gz") else src + ".gz"
+        if orig_gz != src:
+            gz_copy = orig_gz
+
     try:
         # writers
         if not module.check_mode:
-            fclean = io.open(clean_path, "w", encoding="utf-8")
+            fclean = io.open(clean_path, "w", encoding="utf-8", buffering=WRITE_BUFFER)
             # gzip removed if requested
             if p["compress_removed"] and not removed_path.endswith(".gz"):
                 removed_path += ".gz"
             if removed_path.endswith(".gz"):
-                frem = gzip.open(removed_path, "wt", encoding="utf-8")
+                frem = io.TextIOWrapper(io.BufferedWriter(gzip.open(removed_path, "wb"), WRITE_BUFFER), encoding="utf-8")
             else:
-                frem = io.open(removed_path, "w", encoding="utf-8")
+                frem = io.open(removed_path, "w", encoding="utf-8", buffering=WRITE_BUFFER)
         else:
             fclean = io.StringIO()
             frem = io.StringIO()
 
         # stream over entries
-        with io.open(src, "r", encoding="utf-8", errors="replace") as fin:
+        try:
+            fin = open_source(src, gz_copy)
+        except OSError as exc:
+            module.fail_json(msg=f"Failed to open {src}: {exc}")
+        with fin:
             entry = []
-
-            def flush():
-                nonlocal kept, removed, wrote_preamble
+            # A trailing None ends the last entry through the same branch as a blank separator line
+            for line in itertools.chain(fin, (None,)):
+                # isspace() tests in place where strip() would copy every line; file lines are never empty
+                if line is not None and not line.isspace():
+                    entry.append(line)
+                    continue
                 if not entry:
-                    return
-                blob = "".join(entry)
-                dn, ocs, attrs = parse_entry(blob)
-                # Handle preamble blocks (e.g., 'version: 1') without a DN:
+                    continue
+                dn, ocs = parse_entry(entry)
+                # Handle preamble blocks (e.g., 'version: 1') without a DN; not counted as kept/removed
                 if not dn:
-                    if not wrote_preamble and blob.strip():
-                        write_entry(fclean, blob)
+                    if not wrote_preamble:
+                        write_entry(fclean, entry)
                         wrote_preamble = True
-                    # Do not count preamble as kept/removed entry
-                    return
-                if should_drop(dn, ocs, dn_res, oc_all_groups):
-                    write_entry(frem, blob)
+                elif should_drop(dn, ocs, dn_res, oc_all_groups):
+                    write_entry(frem, entry)
                     removed += 1
                 else:
-                    write_entry(fclean, blob)
+                    write_entry(fclean, entry)
                     kept += 1
-
-            for line in fin:
-                if line.strip() == "":
-                    flush()
-                    entry = []
-                else:
-                    entry.append(line)
-            flush()
+                entry = []
 
         if not module.check_mode:
             fclean.close()
             frem.close()
 
-        # compress original if requested
-        orig_gz = None
-        if p["compress_orig"] and not module.check_mode:
-            if not src.endswith(".gz"):
-                try:
-                    with open(src, "rb") as f_in, gzip.open(src + ".gz", "wb") as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                    os.remove(src)
-                except OSError as exc:
-                    module.fail_json(msg=f"Failed to compress {src}: {exc}")
-                orig_gz = src + ".gz"
-            else:
-                orig_gz = src
+        # the compressed copy is complete once the stream above is closed
+        if gz_copy:
+            try:
+                os.remove(src)
+            except OSError as exc:
+                module.fail_json(msg=f"Failed to compress {src}: {exc}")
 
         module.exit_json(
             changed=not module.check_mode and bool(kept or removed),
@@ -179,6 +215,9 @@ def run_module():
             orig_compressed=orig_gz,
         )
     except Exception as e:
+        # never leave a partial compressed original next to the intact source
+        if gz_copy and os.path.exists(gz_copy) and os.path.exists(src):
+            os.remove(gz_copy)
         module.fail_json(msg=str(e))
 
 
@@ -32,6 +32,25 @@ log_error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
+# Root DSE search results per container (0 = responded); the same probe backs several checks
+declare -A ROOT_DSE_RC=()
+
+# Function to run (once per container) an LDAP base search of the root DSE over TCP
+root_dse_search() {
+    local container=$1
+    local port=3389
+
+    if [[ -z "${ROOT_DSE_RC[$container]+x}" ]]; then
+        if podman exec "$container" ldapsearch -x -H "ldap://localhost:$port" \
+            -s base -b '' '(objectClass=*)' 1.1 >/dev/null 2>&1; then
+            ROOT_DSE_RC[$container]=0
+        else
+            ROOT_DSE_RC[$container]=1
+        fi
+    fi
+    return "${ROOT_DSE_RC[$container]}"
+}
+
 # Function to check if container is running
 check_container_running() {
     local container=$1
@@ -70,7 +89,7 @@ check_tcp() {
     log_info "Checking TCP connectivity for $container on port $port..."
 
     # Validate TCP from inside the container via ldapsearch to localhost
-    if podman exec "$container" ldapsearch -x -H "ldap://localhost:$port" -s base -b '' 1.1 >/dev/null 2>&1; then
+    if root_dse_search "$container"; then
         log_success "TCP/LDAP responsive for $container:$port"
         return 0
     else
@@ -82,12 +101,10 @@ check_tcp() {
 # Function to check LDAP TCP connectivity via ldapsearch
 check_ldap_tcp() {
     local container=$1
-    local port=3389
 
     log_info "Checking LDAP TCP via ldapsearch for $container..."
 
-    if podman exec $container ldapsearch -x -H "ldap://localhost:$port" \
-        -s base -b '' '(objectClass=*)' >/dev/null 2>&1; then
+    if root_dse_search "$container"; then
         log_success "LDAP TCP search successful for $container"
         return 0
     else
@@ -138,7 +155,7 @@ check_ds_process() {
     fi
 
     # Last resort: LDAP base search over TCP
-    if podman exec "$container" ldapsearch -x -H "ldap://localhost:3389" -s base -b '' 1.1 >/dev/null 2>&1; then
+    if root_dse_search "$container"; then
         log_success "LDAP responds over TCP in $container"
         return 0
     fi
@@ -257,13 +274,26 @@ main() {
     local total_failures=0
     local start_time=$(date +%s)
 
-    # Check each container individually
+    # Check each container individually; the containers are independent, so the checks run
+    # concurrently and each report is buffered and printed in service order
+    local report_dir
+    report_dir=$(mktemp -d)
+    local -A pids=()
+    for service in "${SERVICES[@]}"; do
+        # run under 'if' so errexit behaves as it does for a direct call
+        ( if check_container_health "$service"; then exit 0; else exit 1; fi ) >"$report_dir/$service" 2>&1 &
+        pids[$service]=$!
+    done
     for service in "${SERVICES[@]}"; do
-        if ! check_container_health "$service"; then
+        local rc=0
+        wait "${pids[$service]}" || rc=$?
+        cat "$report_dir/$service"
+        echo
+        if [[ $rc -ne 0 ]]; then
             ((total_failures++))
         fi
-        echo
     done
+    rm -rf "$report_dir"
 
     # Check inter-container connectivity
     if ! check_mesh_connectivity; then
@@ -37,7 +37,8 @@ fi
 # wait for LDAP port
 for i in $(seq 1 30); do
   ldapsearch -x -H ldap://localhost:${PORT} -s base -b '' '(objectClass=*)' >/dev/null 2>&1 && break
-  sleep 1
+  # no pause after the last probe; nothing is retried after it
+  [ "$i" -eq 30 ] || sleep 1
 done
 
 echo "[init] Ensure backend exists..."
@@ -81,7 +81,8 @@ else
             EXIT_CODE=$?
             break
         fi
-        sleep 1
+        # the kill check below follows the last second directly instead of sleeping past the timeout
+        [ "$i" -eq "$TIMEOUT_SECONDS" ] || sleep 1
     done
     
     # If still running, kill it